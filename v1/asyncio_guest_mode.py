@@ -1,5 +1,7 @@
 import asyncio
 import enum
+import importlib.machinery
+import importlib.util
 import sys
 import threading
 from typing import Union, Callable, Any, Optional, Dict
@@ -184,6 +186,61 @@ class _TkGUI(_GUIBase):
                 
         return result
 
+# 每种模式用来判断工具包是否可用的模块；实现类在 __init__ 里才导入各自的工具包
+_TOOLKIT_MODULES: Dict[GUIMode, str] = {
+    GUIMode.WIN32: 'win32gui',
+    GUIMode.QT: 'PyQt5.QtWidgets',
+    GUIMode.GTK: 'gi',
+    GUIMode.TK: 'tkinter',
+}
+
+_GUI_BACKENDS: Dict[GUIMode, type] = {
+    GUIMode.WIN32: _Win32GUI,
+    GUIMode.QT: _QtGUI,
+    GUIMode.GTK: _GtkGUI,
+    GUIMode.TK: _TkGUI,
+}
+
+def _auto_order():
+    if sys.platform == 'win32':
+        return (GUIMode.WIN32, GUIMode.QT, GUIMode.GTK, GUIMode.TK)
+    return (GUIMode.QT, GUIMode.GTK, GUIMode.TK)
+
+def _find_spec(name: str):
+    """不执行任何模块，查找 name 的 spec，找不到返回 None
+
+    importlib.util.find_spec('a.b') 会先导入父包 a，所以逐级用父包 spec 的
+    submodule_search_locations 查找，只读文件系统。
+    """
+    module = sys.modules.get(name)
+    if module is not None:
+        return getattr(module, '__spec__', None) or importlib.machinery.ModuleSpec(name, None)
+    parent, _, child = name.rpartition('.')
+    if not parent:
+        try:
+            return importlib.util.find_spec(name)
+        except (ImportError, ValueError):
+            return None
+    parent_spec = _find_spec(parent)
+    locations = parent_spec and parent_spec.submodule_search_locations
+    if not locations:
+        return None
+    return importlib.machinery.PathFinder.find_spec(child, list(locations))
+
+def detect_mode() -> GUIMode:
+    """选择 auto 模式下的工具包，不导入任何工具包
+
+    先看应用已经导入的工具包（sys.modules），再按平台顺序用 find_spec 查找。
+    """
+    order = _auto_order()
+    for mode in order:
+        if _TOOLKIT_MODULES[mode] in sys.modules:
+            return mode
+    for mode in order:
+        if _find_spec(_TOOLKIT_MODULES[mode]) is not None:
+            return mode
+    raise GuestModeError("No suitable GUI framework found for mode: auto")
+
 def start_guest_mode(
     coro_or_func: Union[Callable, Any],
     mode: Union[str, GUIMode] = "auto",
@@ -194,34 +251,9 @@ def start_guest_mode(
         mode = GUIMode(mode.lower())
 
     if mode == GUIMode.AUTO:
-        if sys.platform == 'win32':
-            try:
-                import win32gui
-                mode = GUIMode.WIN32
-            except ImportError:
-                pass
-        
-        if mode == GUIMode.AUTO:
-            for test_mode, module_info in [
-                (GUIMode.QT, ('PyQt5.QtWidgets', 'QApplication')),
-                (GUIMode.GTK, ('gi.repository', 'Gtk')),
-                (GUIMode.TK, ('tkinter', 'Tk'))
-            ]:
-                try:
-                    __import__(module_info[0])
-                    mode = test_mode
-                    break
-                except ImportError:
-                    continue
-
-    gui_implementations: Dict[GUIMode, type] = {
-        GUIMode.WIN32: _Win32GUI,
-        GUIMode.QT: _QtGUI,
-        GUIMode.GTK: _GtkGUI,
-        GUIMode.TK: _TkGUI
-    }
+        mode = detect_mode()
 
-    gui_class = gui_implementations.get(mode)
+    gui_class = _GUI_BACKENDS.get(mode)
     if gui_class is None:
         raise GuestModeError(f"No suitable GUI framework found for mode: {mode}")
 
@@ -0,0 +1,72 @@
+"""start_guest_mode 的冷启动开销：工具包探测 + 导入选中的工具包
+
+每次测量在一个新的解释器里进行，统计从导入 asyncio_guest_mode 到选中的工具包
+导入完成的时间，以及期间加载了哪些工具包。auto 模式另外测量旧的探测方式
+（依次 __import__ 每个工具包直到成功），作为对比。
+
+    python bench_cold_start.py --runs 10
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+_SCRIPT = '''
+import importlib, json, sys, time
+started = time.perf_counter()
+import asyncio_guest_mode as m
+mode, legacy = sys.argv[1], sys.argv[2] == '1'
+if mode == 'auto' and legacy:
+    for mode, module in (('qt', 'PyQt5.QtWidgets'), ('gtk', 'gi.repository'), ('tk', 'tkinter')):
+        try:
+            __import__(module)
+            break
+        except ImportError:
+            continue
+mode = m.detect_mode() if mode == 'auto' else m.GUIMode(mode)
+importlib.import_module(m._TOOLKIT_MODULES[mode])
+elapsed = time.perf_counter() - started
+toolkits = sorted({name.split('.')[0] for name in sys.modules} & {'PyQt5', 'gi', 'tkinter', 'win32gui'})
+print(json.dumps({'mode': str(mode.value), 'elapsed': elapsed, 'toolkits': toolkits}))
+'''
+
+MODES = ('auto', 'qt', 'gtk', 'tk', 'win32')
+
+
+def measure(mode, legacy, runs):
+    here = os.path.dirname(os.path.abspath(__file__))
+    samples = []
+    result = None
+    for _ in range(runs):
+        proc = subprocess.run([sys.executable, '-c', _SCRIPT, mode, '1' if legacy else '0'],
+                              cwd=here, capture_output=True, text=True)
+        if proc.returncode != 0:
+            return None
+        result = json.loads(proc.stdout)
+        samples.append(result['elapsed'])
+    result['elapsed'] = statistics.median(samples)
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--modes', nargs='+', choices=MODES, default=list(MODES))
+    args = parser.parse_args(argv)
+
+    print(f'{"mode":<14} {"chosen":<7} {"median ms":>10}  toolkits loaded')
+    for mode in args.modes:
+        for legacy in ((False, True) if mode == 'auto' else (False,)):
+            name = f'{mode} (legacy)' if legacy else mode
+            result = measure(mode, legacy, args.runs)
+            if result is None:
+                print(f'{name:<14} {"-":<7} {"-":>10}  unavailable')
+                continue
+            print(f'{name:<14} {result["mode"]:<7} {result["elapsed"] * 1e3:>10.1f}  '
+                  f'{", ".join(result["toolkits"])}')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,16 @@
 import asyncio
+import collections
+import logging
 import threading
+import time
+from functools import partial
+
+from guest_events import new_guest_event_loop
+from guest_executor import GuestExecutor
+from guest_stats import GuestStats
+import handoff as _handoff
+
+logger = logging.getLogger(__name__)
 
 def is_debug():
     return False  # 简化调试输出
@@ -10,78 +21,508 @@ def schedule_on_asyncio(coro):
         asyncio.run_coroutine_threadsafe(coro, loop)
     return schedule_coro
 
-def asyncio_guest_run(async_func, *async_func_args, run_sync_soon_threadsafe, run_sync_soon_not_threadsafe, done_callback):
-    """最简化的asyncio guest运行函数"""
-    # 创建信号量用于线程协调
-    sem = threading.Semaphore(0)
-    
-    # 创建事件循环
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
-    asyncio._set_running_loop(loop)
-
-    # 修补loop._check_running方法
-    # original_check_running = loop._check_running
-    # def patched_check_running(self):
-    #     # 忽略运行状态检查
-    #     raise Exception('patched_check_running')
-    #     return
-    # loop._check_running = patched_check_running.__get__(loop)
-    count = 0
-    # UI线程函数
-    def process_events_on_ui(events):
-        try:
-            nonlocal count
-            count += 1
-            print(f"ui trigger number: {count}")
-            if not loop.is_closed():
-                # 处理事件和回调
-                loop.process_events(events)
-                loop.process_ready()
-                # 释放信号量让后端线程继续
+class GuestTask(asyncio.Task):
+    """asyncio_guest_run/GuestRunner.run 返回的 task，可以查询 guest loop 的统计"""
+
+    _guest_stats = None
+    _guest_done_callback = None
+    # 从提交到第一步开始执行的秒数，第一步之前为 None
+    first_callback_latency = None
+
+    def stats(self):
+        """guest loop 累计统计的快照（dict），各项含义见 guest_stats.GuestStats；
+        collect_stats=False 时返回 None"""
+        if self._guest_stats is None:
+            return None
+        return self._guest_stats.snapshot(self.get_loop())
+
+
+class GuestLoop:
+    """拉模式的 guest loop：由宿主自己的帧循环驱动，没有后端线程和跨线程回调
+
+    适合每帧本来就要跑一次循环的宿主（pygame/SDL、自定义渲染循环、仿真步进）::
+
+        guest = GuestLoop(main, done_callback=on_done)
+        while not guest.done():
+            ...                              # 宿主自己的输入处理和绘制
+            timeout = guest.tick(0.004)
+            time.sleep(frame_left if timeout is None else min(frame_left, timeout))
+        guest.close()
+
+    参数与 asyncio_guest_run 相同；done_callback 在宿主线程上、tick 内部直接调用。
+    """
+
+    def __init__(self, async_func, *async_func_args, done_callback=None, timer_store=None,
+                 timerfd=None, slow_callback_log=128, slow_callback_duration=None):
+        loop = new_guest_event_loop()
+        asyncio.set_event_loop(loop)
+        asyncio._set_running_loop(loop)
+        if timer_store is not None:
+            loop.set_timer_store(timer_store)
+        if timerfd is not None:
+            loop.set_timerfd(timerfd)
+        loop.set_slow_callback_log(slow_callback_log, slow_callback_duration)
+        self.loop = loop
+        self.done_callback = done_callback
+        self.task = GuestTask(async_func(*async_func_args), loop=loop)
+        self.task.add_done_callback(self._on_task_done)
+
+    def _on_task_done(self, fut):
+        if self.done_callback is None:
+            return
+        if fut.cancelled():
+            self.done_callback(asyncio.CancelledError())
+        elif fut.exception():
+            self.done_callback(fut.exception())
+        else:
+            self.done_callback(fut.result())
+
+    def done(self):
+        return self.task.done()
+
+    def tick(self, max_time=None):
+        """非阻塞地轮询并处理 I/O 事件，在 max_time 秒的预算内执行就绪回调
+
+        返回到下一次需要 tick 的秒数：0 表示还有回调没执行完，None 表示只等 I/O。
+        """
+        loop = self.loop
+        loop.process_events(loop.poll_events(0))
+        loop.process_ready(max_time)
+        return loop._guest_timeout()
+
+    def fileno(self):
+        """自带 poller 的宿主（select/Twisted/GLib 等）可以等待的 fd，见 loop.backend_fd()"""
+        return self.loop.backend_fd()
+
+    def timeout(self):
+        """阻塞等待 fileno() 之前调用，返回可以等待的秒数，None 表示不用超时
+
+        含义与 tick() 的返回值相同；此后调度的更早的工作会让 fileno() 可读。
+        """
+        return self.loop.backend_timeout()
+
+    def close(self):
+        # 宿主可能推迟到事件循环里再关，这时当前线程也许已经换成了另一个 guest loop
+        if asyncio._get_running_loop() is self.loop:
+            asyncio._set_running_loop(None)
+            asyncio.set_event_loop(None)
+        self.loop.close()
+
+
+class GuestRunner:
+    """常驻的 guest loop 和后端线程，可以先后或同时运行多个协程
+
+    每次 asyncio_guest_run 都要新建 loop（selector、self-pipe）、信号量和后端线程；
+    一个窗口里要跑很多短任务时，用同一个 GuestRunner 省掉这些开销::
+
+        with GuestRunner(host.run_sync_soon_threadsafe, host.run_sync_soon_not_threadsafe) as runner:
+            runner.run(fetch, url, done_callback=on_done)
+            ...
+
+    构造时创建 loop 并启动后端线程，后端线程在没有任务时阻塞在 select 上，不占 CPU。
+    guest_executor=True 时 loop 的默认 executor 是 guest_executor.GuestExecutor，
+    构造时预先启动 executor_prewarm 个工作线程；run_in_executor(None, ...) 和
+    getaddrinfo 的结果直接投递到宿主线程，在那次派发里设置 future 并执行由此就绪的回调。
+    参数的含义见 asyncio_guest_run，区别在于：
+      - 要运行的协程和 done_callback 不在构造时给出，每次 run() 时传入；
+      - run_sync_soon_not_threadsafe 可以省略，None 时与 run_sync_soon_threadsafe 相同；
+      - executor_prewarm 默认 2（asyncio_guest_run 为 0）；
+      - 多一个 loop_factory，默认 guest_events.new_guest_event_loop，也可以是混入了
+        GuestEventLoopMixin 的其他 loop 类；
+      - 不会自己关闭，用完要调用 close() 或用 with。
+    run() 和 close() 必须在宿主线程上、tick 之外调用，构造所在的线程就是宿主线程。
+    """
+
+    def __init__(self, run_sync_soon_threadsafe, run_sync_soon_not_threadsafe=None, *,
+                 ready_budget=None, drain_budget=None, timer_store=None, timerfd=None, tracer=None,
+                 slow_callback_log=128, slow_callback_duration=None, collect_stats=True,
+                 pipeline=False, handoff=None, loop_factory=None, guest_executor=True,
+                 executor_prewarm=2):
+        if pipeline and drain_budget is not None:
+            # drain 模式在 UI 线程上自己轮询，会和并行轮询的后端线程拿到同一批事件
+            raise ValueError('pipeline cannot be combined with drain_budget')
+        self.run_sync_soon_threadsafe = run_sync_soon_threadsafe
+        self.run_sync_soon_not_threadsafe = run_sync_soon_not_threadsafe = (
+            run_sync_soon_not_threadsafe or run_sync_soon_threadsafe)
+        self._host_thread = threading.get_ident()
+        # 创建信号量用于线程协调
+        if handoff is None:
+            handoff = 'eventfd' if _handoff.AVAILABLE else 'semaphore'
+        if handoff == 'eventfd':
+            sem = _handoff.EventFdSemaphore()
+        elif handoff == 'semaphore':
+            sem = threading.Semaphore(0)
+        else:
+            raise ValueError(f'unknown handoff {handoff!r}')
+
+        # 创建事件循环
+        loop = (loop_factory or new_guest_event_loop)()
+        asyncio.set_event_loop(loop)
+        asyncio._set_running_loop(loop)
+        if timer_store is not None:
+            loop.set_timer_store(timer_store)
+        if timerfd is not None:
+            loop.set_timerfd(timerfd)
+        loop.set_slow_callback_log(slow_callback_log, slow_callback_duration)
+        self.loop = loop
+        self.stats = stats = GuestStats() if collect_stats else None
+        self._tasks = set()
+        self._closing = False
+        self._sem = sem
+
+        count = 0
+        # 流水线模式：后端线程交出一批事件后马上开始下一次轮询，与 UI 线程处理这一批重叠，
+        # 最多多排一批（信号量多给一个许可）。水平触发的 fd 在 UI 读走数据之前一直就绪，
+        # 所以已交出但还没处理完的那一批里的 (fd, mask) 不再重复上报
+        filter_inflight = pipeline and isinstance(loop, asyncio.SelectorEventLoop)
+        # 已交出/已处理完的批数；构造时的第一个 tick 也会 release，算作第 1 批
+        posted_batches = 1
+        finished_batches = 0
+        # 有一批还没处理完时轮询只等 I/O，_ready 和定时器留给那个 tick 结束时的检查
+        tick_pending = (lambda: finished_batches < posted_batches) if pipeline else None
+
+        def run_tick(events):
+            loop.process_events(events)
+            pending = loop.process_ready(ready_budget)
+            if not pending and drain_budget is not None:
+                pending = loop.drain_ready(drain_budget)
+            return pending
+
+        release = sem.release
+        if pipeline:
+            def release():
+                nonlocal finished_batches
+                finished_batches += 1
                 sem.release()
-        except Exception as e:
-            print(rf'{__file__}:{process_events_on_ui.__name__} e: {e}')
-            raise  
-    # 后端线程函数
-    def backend_thread_loop():
-        from functools import partial
-        try:
-            while not loop.is_closed():
-                # 等待UI线程处理完成
-                sem.acquire()
-                
-                # 轮询I/O事件
-                #loop._last_events = loop.poll_events()
-                events = loop.poll_events()
-                # 请求UI线程处理事件
-                run_sync_soon_threadsafe(partial(process_events_on_ui, events))
-        except Exception as e:
-            print(f"后端线程错误: {e}")
-            run_sync_soon_threadsafe(lambda: done_callback(Exception(str(e))))
-    
-    # 创建任务
-    task = loop.create_task(async_func(*async_func_args))
-    
-    # 设置完成回调
-    def on_task_done(fut):
+                # 后端线程在这个 tick 期间算出的轮询超时可能已经过时
+                loop._recheck_guest_poll()
+
+        if stats is not None:
+            def run_tick(events):
+                started = time.perf_counter()
+                loop.process_events(events)
+                events_done = time.perf_counter()
+                pending = loop.process_ready(ready_budget)
+                if not pending and drain_budget is not None:
+                    pending = loop.drain_ready(drain_budget)
+                stats.process_events_time.add(events_done - started)
+                stats.process_ready_time.add(time.perf_counter() - events_done)
+                return pending
+
+            unmeasured_release = release
+
+            def release():
+                started = time.perf_counter()
+                unmeasured_release()
+                stats.ui_sem_release.add(time.perf_counter() - started)
+
+        if pipeline:
+            unpipelined_run_tick = run_tick
+
+            def run_tick(events):
+                # tick 期间调度的工作不叫醒并行的轮询，release 时统一检查一次
+                loop._guest_defer_wake = True
+                try:
+                    return unpipelined_run_tick(events)
+                finally:
+                    loop._guest_defer_wake = False
+
+        # UI线程函数
+        def process_events_on_ui(events):
+            try:
+                nonlocal count
+                count += 1
+                if not loop.is_closed():
+                    # 处理事件和回调
+                    if run_tick(events):
+                        # 预算用完，先把控制权还给宿主，再立即接着执行剩下的回调
+                        run_sync_soon_not_threadsafe(partial(process_events_on_ui, ()))
+                        return
+                    # 释放信号量让后端线程继续
+                    release()
+            except Exception:
+                logger.exception('guest tick failed')
+                raise
+
+        # 只在 tracer 或统计启用时计时；后端线程把这次轮询的投递时间和耗时随事件一起交出
+        measure = tracer is not None or stats is not None
+        if measure:
+            unmeasured_process_events_on_ui = process_events_on_ui
+
+            def process_events_on_ui(events, posted_at=0.0, poll=0.0):
+                # 重新投递的 tick 不是由轮询触发的，轮询耗时记为 0、不计派发延迟
+                lag = time.perf_counter() - posted_at if posted_at else None
+                ready_before = loop._ready_processed
+                try:
+                    unmeasured_process_events_on_ui(events)
+                finally:
+                    ready = loop._ready_processed - ready_before
+                    if tracer is not None:
+                        tracer.record(count, poll, len(events), ready, lag or 0.0)
+                    if stats is not None:
+                        stats.record_tick(ready, lag, loop._timer_count())
+
+        # 后端线程函数
+        def backend_thread_loop():
+            nonlocal posted_batches
+            inflight = {}
+            try:
+                while not self._closing:
+                    # 等待UI线程处理完成
+                    waiting = time.perf_counter() if measure else 0.0
+                    sem.acquire()
+                    while not self._closing:
+                        # 轮询之前记下还没处理完的那一批：select 期间 UI 可能处理完它、读走数据，
+                        # 但返回的仍是读走之前的就绪，按轮询后的批数判断会把它再投递一次
+                        unfinished = (inflight if filter_inflight and finished_batches < posted_batches
+                                      else None)
+                        started = time.perf_counter() if measure else 0.0
+                        # 轮询I/O事件
+                        events = loop.poll_events(tick_pending=tick_pending)
+                        if unfinished is None or not events:
+                            break
+                        events = [(key, mask & ~unfinished.get(key.fd, 0)) for key, mask in events
+                                  if mask & ~unfinished.get(key.fd, 0)]
+                        if events:
+                            break
+                        # 就绪的只有 UI 还没处理的 fd：等这一批处理完再轮询，手里的许可留给下一次
+                        sem.acquire()
+                        sem.release()
+                    if self._closing:
+                        break
+                    if pipeline:
+                        if filter_inflight:
+                            inflight = {key.fd: mask for key, mask in events}
+                        posted_batches += 1
+                    # 请求UI线程处理事件
+                    if measure:
+                        posted_at = time.perf_counter()
+                        if stats is not None:
+                            stats.record_poll(started - waiting, posted_at - started, len(events))
+                        run_sync_soon_threadsafe(
+                            partial(process_events_on_ui, events, posted_at, posted_at - started))
+                    else:
+                        run_sync_soon_threadsafe(partial(process_events_on_ui, events))
+            except Exception as e:
+                logger.exception('guest backend thread failed')
+                run_sync_soon_threadsafe(partial(fail_tasks, Exception(str(e))))
+
+        # 后端线程挂掉后 loop 不会再被驱动，在宿主线程上通知所有未完成的任务；
+        # 任务留在 _tasks 里，close() 照样取消它们、执行 finally，但不再调用 done_callback
+        def fail_tasks(exc):
+            for task in list(self._tasks):
+                done_callback = task._guest_done_callback
+                if done_callback is not None:
+                    task._guest_done_callback = None
+                    done_callback(exc)
+
+        # executor 的完成回调：工作线程放进队列，一批只向宿主投递一次
+        completions = collections.deque()
+        completions_posted = False
+
+        def run_completions():
+            nonlocal completions_posted
+            # 先清标记再取：清标记之后放进来的会重新投递，最多多一次空的派发
+            completions_posted = False
+            if loop.is_closed():
+                completions.clear()
+                return
+            # 后端线程可能正阻塞在 select 上、按旧的 _ready 和定时器算的超时，
+            # 与流水线模式的 tick 一样先不叫醒它，结束后按最终状态检查一次
+            loop._guest_defer_wake = True
+            try:
+                while completions:
+                    completions.popleft()()
+                # 被 future 唤醒的任务直接在这次派发里执行，不用等后端线程投递 tick
+                loop.process_ready(ready_budget)
+            finally:
+                loop._guest_defer_wake = False
+            loop._recheck_guest_poll()
+
+        def post_completion(func):
+            nonlocal completions_posted
+            completions.append(func)
+            if self._closing:
+                # close() 在宿主线程上自己驱动 loop、每轮取走队列，宿主不一定还在派发，
+                # 只叫醒 close() 里的轮询
+                loop._write_to_self()
+            elif not completions_posted:
+                completions_posted = True
+                # 提交时已经完成的调用在宿主线程上直接执行完成回调
+                self._run_sync_soon(run_completions)
+
+        if guest_executor:
+            executor = GuestExecutor(post_completion=post_completion)
+            executor.prewarm(executor_prewarm)
+            loop.set_default_executor(executor)
+        self._run_completions = run_completions
+
+        # 还没有任务，这次 tick 只是把第一轮轮询交给后端线程
+        process_events_on_ui([])
+        if pipeline:
+            sem.release()
+
+        # 启动后端线程
+        self._backend = threading.Thread(target=backend_thread_loop, daemon=True)
+        self._backend.start()
+
+    def run(self, async_func, *async_func_args, done_callback):
+        """在 guest loop 上运行 async_func(*async_func_args)，返回 GuestTask
+
+        第一步在宿主下一次派发 tick 时执行；结束时在宿主线程上经 run_sync_soon_not_threadsafe
+        调用 done_callback(outcome)。task.first_callback_latency 是从 run() 到第一步开始的秒数。
+        """
+        if self._closing:
+            raise RuntimeError('GuestRunner is closed')
+        loop = self.loop
+        run_sync_soon = self._run_sync_soon
+        stats = self.stats
+        submitted = time.perf_counter()
+        task = None
+
+        # 排在 task 第一步之前，同一个 tick 里紧接着执行
+        def first_callback():
+            latency = time.perf_counter() - submitted
+            task.first_callback_latency = latency
+            if stats is not None:
+                stats.first_callback.add(latency)
+
+        loop.call_soon(first_callback)
+        # 创建任务
+        task = GuestTask(async_func(*async_func_args), loop=loop)
+        task._guest_stats = stats
+        task._guest_done_callback = done_callback
+
+        # 设置完成回调；task 在 tick 里结束，通常已经在宿主线程上
+        def on_task_done(fut):
+            self._tasks.discard(fut)
+            # 后端线程失败时 fail_tasks 已经交付过结果
+            done_callback = fut._guest_done_callback
+            if done_callback is None:
+                return
+            fut._guest_done_callback = None
+            try:
+                if fut.cancelled():
+                    run_sync_soon(lambda: done_callback(asyncio.CancelledError()))
+                elif fut.exception():
+                    run_sync_soon(lambda: done_callback(fut.exception()))
+                else:
+                    run_sync_soon(lambda: done_callback(fut.result()))
+            except Exception as e:
+                run_sync_soon(lambda: done_callback(Exception(str(e))))
+
+        task.add_done_callback(on_task_done)
+        self._tasks.add(task)
+        return task
+
+    def _run_sync_soon(self, func):
+        # 已经在宿主线程上时走宿主不加锁的 run_sync_soon_not_threadsafe，与 trio 的 guest mode 相同
+        if threading.get_ident() == self._host_thread:
+            self.run_sync_soon_not_threadsafe(func)
+        else:
+            self.run_sync_soon_threadsafe(func)
+
+    def close(self, timeout=1.0):
+        """停止后端线程，取消未完成的任务并关闭 loop
+
+        被取消的任务在当前线程上最多再跑 timeout 秒，让它们的 finally 有机会执行
+        （finally 里可以 await run_in_executor/to_thread）；它们的 done_callback 照常投递给宿主。
+        """
+        if self._closing:
+            return
+        self._closing = True
+        loop = self.loop
+        # 后端线程可能阻塞在 select 或信号量上，两个都叫醒
+        loop._write_to_self()
+        self._sem.release()
+        self._backend.join()
+        if isinstance(self._sem, _handoff.EventFdSemaphore):
+            self._sem.close()
+
+        for task in list(self._tasks):
+            task.cancel()
+        deadline = time.perf_counter() + timeout
+        while self._tasks:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            # executor 的完成回调不再经宿主派发，在这里取走
+            self._run_completions()
+            if not self._tasks:
+                break
+            wait = loop._guest_timeout()
+            loop.process_events(loop.poll_events(remaining if wait is None else min(wait, remaining)))
+            loop.process_ready()
+
+        # 一次性运行时 done_callback 里可能已经启动了下一个 guest loop，不要把它清掉
+        if asyncio._get_running_loop() is loop:
+            asyncio._set_running_loop(None)
+            asyncio.set_event_loop(None)
+        loop.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def asyncio_guest_run(async_func, *async_func_args, run_sync_soon_threadsafe, run_sync_soon_not_threadsafe, done_callback,
+                      ready_budget=None, drain_budget=None, timer_store=None, timerfd=None, tracer=None,
+                      slow_callback_log=128, slow_callback_duration=None, collect_stats=True,
+                      pipeline=False, handoff=None, guest_executor=True, executor_prewarm=0):
+    """最简化的asyncio guest运行函数
+
+    run_sync_soon_not_threadsafe: 只在宿主线程上调用的投递方式，宿主可以用不加锁的队列实现；
+        已经在宿主线程上时（task 结束时的 done_callback、预算用完后接着执行的 tick）使用，
+        None 表示与 run_sync_soon_threadsafe 相同。
+    ready_budget: 每个宿主 tick 执行就绪回调的时间预算（秒），例如 0.004。
+        超出预算时剩余回调留到立即重新投递的下一个 tick，让宿主的输入事件可以插队；
+        统计见 loop.ready_budget_stats()。None 表示不限。
+    drain_budget: drain 模式的时间预算（秒）。处理完一批后 _ready 仍非空时（sleep(0)、
+        future 回调链等），直接在 UI 线程上用非阻塞轮询接着处理，不再经过
+        sem.release -> 后端 select(0) -> run_sync_soon_threadsafe 的往返；
+        只有 loop 真的需要阻塞时才交还给后端线程。None 表示关闭。
+    timer_store: 可插拔的定时器存储，例如 timer_store.TimingWheel()；None 使用默认的堆。
+    timerfd: timerfd.TimerFd(spin=...)，仅 Linux。定时器到期时由 timerfd 精确唤醒后端线程，
+        不再依赖按毫秒取整的 select 超时；None 表示关闭。
+    tracer: guest_trace.TickTracer，每个 tick 记录一条轮询耗时/事件数/就绪数/派发延迟；
+        None 时 tick 里只多一次判断，不做任何计时和输出。
+    slow_callback_log: 慢回调日志的条数，默认开启；每个 handle 用 perf_counter_ns 计时，
+        超过 slow_callback_duration 秒（默认 loop.slow_callback_duration）的回调连同
+        task 名和协程栈记入 loop.slow_callbacks()，不需要 PYTHONASYNCIODEBUG。0/None 关闭。
+    collect_stats: 默认开启，返回的 task.stats() 给出 tick 数、每次轮询的事件数和每个 tick
+        的就绪回调数分布、poll_events/process_events/process_ready 耗时、派发延迟、
+        两侧信号量等待和定时器数量；每个 tick 多几次 perf_counter 和固定分桶直方图计数。
+    pipeline: 流水线轮询。后端线程交出一批事件后不等 UI 线程处理完就开始下一次轮询，
+        最多多排一批；还没处理完的那一批里的 fd 不会重复上报。适合高频 socket 负载；
+        连接少、每次轮询只有零星事件时多出的空轮询反而更慢。默认关闭，严格交替。
+    handoff: UI 线程与后端线程每个 tick 的交接方式。'eventfd' 用 handoff.EventFdSemaphore，
+        一次交接各一次系统调用；'semaphore' 用 threading.Semaphore。None 表示有
+        os.eventfd（Linux，Python 3.10+）时用 eventfd。
+    guest_executor: 默认开启，loop 的默认 executor 换成 guest_executor.GuestExecutor，
+        run_in_executor(None, ...)/getaddrinfo 的结果由工作线程直接投递给宿主，
+        宿主派发时设置 future 并执行就绪的回调，省掉一次后端线程的唤醒、轮询和投递。
+        False 使用 asyncio 自带的默认 executor。
+    executor_prewarm: 预先启动的 executor 工作线程数，第一次 run_in_executor 不用再等
+        线程创建。一次性运行默认 0（按需创建），常驻的 GuestRunner 默认 2。
+
+    相当于只运行一个协程的 GuestRunner。done_callback 返回后 runner 自己 close()：
+    停止并等待后端线程、关闭交接用的 eventfd 和 loop，调用方不用再做清理。
+    """
+    def on_done(outcome):
         try:
-            if fut.cancelled():
-                run_sync_soon_threadsafe(lambda: done_callback(asyncio.CancelledError()))
-            elif fut.exception():
-                run_sync_soon_threadsafe(lambda: done_callback(fut.exception()))
-            else:
-                run_sync_soon_threadsafe(lambda: done_callback(fut.result()))
-        except Exception as e:
-            run_sync_soon_threadsafe(lambda: done_callback(Exception(str(e))))
-    
-    task.add_done_callback(on_task_done)
-    
-    # after create task, ready deque is not empty
-    process_events_on_ui([])
-    #sem.release()
-    
-    # 启动后端线程
-    threading.Thread(target=backend_thread_loop, daemon=True).start()
-    
-    return task
+            done_callback(outcome)
+        finally:
+            # done_callback 经宿主派发调用，在 tick 之外，可以在这里关闭
+            runner.close()
+
+    runner = GuestRunner(
+        run_sync_soon_threadsafe, run_sync_soon_not_threadsafe,
+        ready_budget=ready_budget, drain_budget=drain_budget, timer_store=timer_store,
+        timerfd=timerfd, tracer=tracer, slow_callback_log=slow_callback_log,
+        slow_callback_duration=slow_callback_duration, collect_stats=collect_stats,
+        pipeline=pipeline, handoff=handoff, guest_executor=guest_executor,
+        executor_prewarm=executor_prewarm,
+    )
+    return runner.run(async_func, *async_func_args, done_callback=on_done)
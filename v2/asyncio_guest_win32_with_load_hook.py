@@ -19,9 +19,6 @@ import sys
 from importlib.util import spec_from_file_location, module_from_spec
 import os
 
-#TODO this does not work?
-os.environ['PYTHONASYNCIODEBUG'] = '1'
-
 class SimpleFinder:
     def __init__(self, overrides):
         # overrides 是一个字典，key是模块名，value是替换文件的路径
@@ -40,11 +37,12 @@ class SimpleFinder:
 patch_dir = os.path.join(os.path.dirname(__file__), 'patches')  # 你的补丁目录
 overrides = {
     #'asyncio.windows_events': os.path.join(patch_dir, 'windows_events.py'),
-    'asyncio.base_events': os.path.join(patch_dir, 'base_events_patched.py'),
+    # guest mode 已经由 guest_events.py 的 loop 子类提供，不再需要替换 asyncio.base_events
+    #'asyncio.base_events': os.path.join(patch_dir, 'base_events_patched.py'),
     'amodule': os.path.join(patch_dir, 'amodule_patched.py'),
 }
 
-# 安装 finder（需要在任何 asyncio 导入之前）
+# 安装 finder（需要在导入 amodule 之前）
 sys.meta_path.insert(0, SimpleFinder(overrides))
 # ---end--- hook helper
 
@@ -52,7 +50,6 @@ import amodule
 amodule.say_hello()
 
 import traceback
-from queue import Queue
 
 import win32api
 import win32con
@@ -65,24 +62,10 @@ from pywin.mfc import dialog
 import example_tasks_asyncio
 
 import asyncio_guest_run
+from dispatcher import CoalescingDispatcher
 
 TRIO_MSG = win32con.WM_APP + 3
 
-# 使用线程安全的 Queue 代替 deque
-trio_functions = Queue()
-
-def do_trio():
-    """Process all pending trio tasks in the queue"""
-    while not trio_functions.empty():
-        try:
-            # 获取并执行一个任务
-            func = trio_functions.get()
-            func()
-        except Exception as e:
-            print(rf"{__file__}:{do_trio.__name__} e: {e}")
-            print(traceback.format_exc())
-            raise e
-
 class Win32Host:
     def __init__(self, display):
         self.display = display
@@ -92,6 +75,8 @@ class Win32Host:
             win32con.NULL, win32con.WM_USER, win32con.WM_USER, win32con.PM_NOREMOVE
         )
         self.create_message_window()
+        # 一批回调只 PostMessage 一次，窗口过程里整批执行
+        self.dispatcher = CoalescingDispatcher(self.post_trio_msg)
 
     def create_message_window(self):
         # 注册窗口类
@@ -109,7 +94,7 @@ class Win32Host:
     def trio_wndproc_func(self, hwnd, msg, wparam, lparam):
         if msg == TRIO_MSG:
             # 处理所有排队的 trio 任务
-            do_trio()
+            self.do_trio()
             return 0
         # elif msg == DESTROY_WINDOW_MSG:
         #     # 在正确的线程中销毁窗口
@@ -118,15 +103,25 @@ class Win32Host:
         else:
             return win32gui.DefWindowProc(hwnd, msg, wparam, lparam)
 
-    def run_sync_soon_threadsafe(self, func):
-        """先添加函数到队列，后发送消息"""
-        trio_functions.put(func)
+    def do_trio(self):
+        """Process all pending trio tasks in the batch"""
+        try:
+            self.dispatcher.drain()
+        except Exception as e:
+            print(rf"{__file__}:{self.do_trio.__name__} e: {e}")
+            print(traceback.format_exc())
+            raise e
+
+    def post_trio_msg(self, drain):
         win32api.PostMessage(self.msg_hwnd, TRIO_MSG, 0, 0)
 
+    def run_sync_soon_threadsafe(self, func):
+        """先添加函数到批次，只有批次的第一个函数发送消息"""
+        self.dispatcher.run_sync_soon_threadsafe(func)
+
     def run_sync_soon_not_threadsafe(self, func):
         """与 threadsafe 相同，保持一致性"""
-        trio_functions.put(func)
-        win32api.PostMessage(self.msg_hwnd, TRIO_MSG, 0, 0)
+        self.dispatcher.run_sync_soon_threadsafe(func)
 
     def done_callback(self, outcome):
         """non-blocking request to end the main loop"""
@@ -0,0 +1,15 @@
+"""asyncio guest mode 基准测试
+
+用法（在 v2 目录下）::
+
+    python -m bench.guest_latency --help
+
+guest mode 的 poll_events/process_events/process_ready 由 guest_events.py 中的
+标准 loop 子类提供，不需要 import hook；导入本包只是把 v2 目录加入 sys.path。
+"""
+import os
+import sys
+
+_v2_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _v2_dir not in sys.path:
+    sys.path.insert(0, _v2_dir)
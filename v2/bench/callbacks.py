@@ -0,0 +1,127 @@
+"""宿主回调的吞吐量：同线程（run_sync_soon_not_threadsafe）与跨线程（run_sync_soon_threadsafe）分开测
+
+host 一组只测 HeadlessHost 本身：
+    same/locked     宿主线程上经 run_sync_soon_threadsafe 投递（加锁、notify）
+    same/local      宿主线程上经 run_sync_soon_not_threadsafe 投递（不加锁的 deque）
+    cross/locked    threads 个其他线程经 run_sync_soon_threadsafe 投递
+    cross/coalesce  同上，HeadlessHost(coalesce=True)，一批只投递一条消息
+每种都投递 n 个回调，计时到最后一个在宿主线程上执行完。
+runner 一组用同一个 GuestRunner 先后跑 n 个立即结束的任务，done_callback 里提交下一个，
+对比不传 run_sync_soon_not_threadsafe（全部走加锁的路径）和传入时每秒完成的任务数。
+
+    python -m bench.callbacks --n 200000 --threads 1 4
+"""
+import argparse
+import contextlib
+import io
+import threading
+import time
+
+from bench.host import HeadlessHost
+
+from asyncio_guest_run import GuestRunner
+
+
+def _same_thread(n, local):
+    host = HeadlessHost()
+    post = host.run_sync_soon_not_threadsafe if local else host.run_sync_soon_threadsafe
+    count = 0
+
+    def callback():
+        nonlocal count
+        count += 1
+        if count == n:
+            host.done_callback(None)
+
+    def submit():
+        for _ in range(n):
+            post(callback)
+
+    host.post_message(submit)
+    started = time.perf_counter()
+    host.mainloop()
+    return time.perf_counter() - started
+
+
+def _cross_thread(n, threads, coalesce):
+    host = HeadlessHost(coalesce=coalesce)
+    total = n * threads
+    count = 0
+
+    def callback():
+        nonlocal count
+        count += 1
+        if count == total:
+            host.done_callback(None)
+
+    def producer():
+        for _ in range(n):
+            host.run_sync_soon_threadsafe(callback)
+
+    workers = [threading.Thread(target=producer, daemon=True) for _ in range(threads)]
+    started = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    host.mainloop()
+    elapsed = time.perf_counter() - started
+    for worker in workers:
+        worker.join()
+    return elapsed
+
+
+async def _noop():
+    pass
+
+
+def _runner(n, local):
+    host = HeadlessHost()
+    with contextlib.redirect_stdout(io.StringIO()):
+        runner = GuestRunner(host.run_sync_soon_threadsafe,
+                             host.run_sync_soon_not_threadsafe if local else None)
+        remaining = n
+
+        def done_callback(outcome):
+            nonlocal remaining
+            remaining -= 1
+            if isinstance(outcome, BaseException) or not remaining:
+                host.done_callback(outcome)
+            else:
+                runner.run(_noop, done_callback=done_callback)
+
+        started = time.perf_counter()
+        runner.run(_noop, done_callback=done_callback)
+        host.mainloop()
+        elapsed = time.perf_counter() - started
+        runner.close()
+    if isinstance(host.outcome, BaseException):
+        raise host.outcome
+    return elapsed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--n', type=int, default=200000, help='每组投递的回调数（跨线程为每个线程）')
+    parser.add_argument('--threads', type=int, nargs='+', default=[1, 4], help='跨线程的提交线程数')
+    parser.add_argument('--tasks', type=int, default=20000, help='runner 一组的任务数')
+    args = parser.parse_args(argv)
+
+    print(f'{"group":<7} {"path":<15} {"threads":>7} {"per sec":>10} {"us each":>8}')
+
+    def report(group, path, threads, count, elapsed):
+        print(f'{group:<7} {path:<15} {threads:>7} {count / elapsed:>10.0f} '
+              f'{elapsed / count * 1e6:>8.2f}', flush=True)
+
+    for local in (False, True):
+        report('host', 'same/local' if local else 'same/locked', 1, args.n,
+               _same_thread(args.n, local))
+    for threads in args.threads:
+        for coalesce in (False, True):
+            report('host', 'cross/coalesce' if coalesce else 'cross/locked', threads,
+                   args.n * threads, _cross_thread(args.n, threads, coalesce))
+    for local in (False, True):
+        report('runner', 'not_threadsafe' if local else 'threadsafe', 1, args.tasks,
+               _runner(args.tasks, local))
+
+
+if __name__ == '__main__':
+    main()
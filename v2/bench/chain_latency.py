@@ -0,0 +1,67 @@
+"""guest mode 协程链延迟基准
+
+测量一条 await asyncio.sleep(0) 链（以及 future 回调链）走完所需的时间和宿主消息数，
+对比 drain 模式开/关。
+
+    python -m bench.chain_latency --depth 100 --rounds 200
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import time
+
+from bench.host import HeadlessHost
+from bench.guest_latency import summarize, _fmt
+
+from asyncio_guest_run import asyncio_guest_run
+
+
+async def _chain(depth, rounds, samples):
+    loop = asyncio.get_running_loop()
+    for _ in range(rounds):
+        # 先让 loop 空闲下来，保证每一轮都从后端阻塞轮询开始
+        await asyncio.sleep(0.001)
+        start = time.perf_counter()
+        for _ in range(depth):
+            await asyncio.sleep(0)
+        fut = loop.create_future()
+        loop.call_soon(fut.set_result, None)
+        await fut
+        samples.append(time.perf_counter() - start)
+
+
+def run(depth, rounds, drain_budget):
+    samples = []
+    host = HeadlessHost()
+    with contextlib.redirect_stdout(io.StringIO()):
+        task = asyncio_guest_run(
+            _chain, depth, rounds, samples,
+            run_sync_soon_threadsafe=host.run_sync_soon_threadsafe,
+            run_sync_soon_not_threadsafe=host.run_sync_soon_not_threadsafe,
+            done_callback=host.done_callback,
+            drain_budget=drain_budget,
+        )
+        host.mainloop()
+    if isinstance(host.outcome, BaseException):
+        raise host.outcome
+    return samples, len(host.dispatch_lags) / rounds
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--depth', type=int, default=100)
+    parser.add_argument('--rounds', type=int, default=200)
+    parser.add_argument('--drain-budget', type=float, default=4.0,
+                        help='drain 模式的时间预算（毫秒）')
+    args = parser.parse_args(argv)
+
+    print(f'{"mode":<8} {"host msgs/round":>15} {"p50":>8} {"p99":>8} {"p999":>8}  (ms)')
+    for mode, drain_budget in (('strict', None), ('drain', args.drain_budget / 1e3)):
+        samples, msgs = run(args.depth, args.rounds, drain_budget)
+        s = summarize(samples)
+        print(f'{mode:<8} {msgs:>15.1f} {_fmt(s["p50"])} {_fmt(s["p99"])} {_fmt(s["p999"])}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,325 @@
+"""guest_events 在多个 Python 版本上的兼容性冒烟测试和启动耗时
+
+对每个解释器在新进程里跑一组 guest mode 场景（拉模式 tick、后端线程 + HeadlessHost、
+跨线程 call_soon_threadsafe、socket I/O、大量取消的定时器和压缩、定时器存储、timerfd、
+close() 时在 finally 里等 executor 的清理、后端线程失败时只交付一次结果、executor 预热），
+并统计冷启动耗时：从导入 asyncio_guest_run 到 task 的第一步开始执行。
+subclass 是 guest_events 的 loop 子类；hook 是旧的 import hook 换掉 asyncio.base_events
+（patches/base_events_patched.py 对应单个 CPython 版本，其他版本上可能无法导入）。
+
+    python -m bench.compat --pythons python3.10 python3.11 python3.12 python3.13 python3.14
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+
+_V2_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_STARTUP = '''
+import sys, time
+started = time.perf_counter()
+if sys.argv[1] == 'hook':
+    import os
+    from importlib.util import spec_from_file_location
+
+    class Finder:
+        def find_spec(self, fullname, path, target=None):
+            if fullname == 'asyncio.base_events':
+                return spec_from_file_location(
+                    fullname, os.path.join('patches', 'base_events_patched.py'))
+
+    sys.meta_path.insert(0, Finder())
+from asyncio_guest_run import GuestLoop
+first_step = None
+
+async def main():
+    global first_step
+    first_step = time.perf_counter()
+
+guest = GuestLoop(main)
+while not guest.done():
+    guest.tick()
+guest.close()
+print(first_step - started)
+'''
+
+
+def _smoke_checks():
+    """在当前解释器里运行的场景，返回 {名称: None 或错误信息}"""
+    import asyncio
+    import socket
+    import threading
+    import time
+
+    from asyncio_guest_run import GuestLoop, GuestRunner, asyncio_guest_run
+    from bench.host import HeadlessHost
+    from guest_events import new_guest_event_loop
+    from guest_executor import GuestExecutor
+    from timer_store import HeapTimerStore, TimingWheel
+
+    def pull(main, **kwargs):
+        guest = GuestLoop(main, **kwargs)
+        try:
+            while not guest.done():
+                timeout = guest.tick()
+                if timeout:
+                    guest.loop.process_events(guest.loop.poll_events(min(timeout, 0.05)))
+            return guest.task.result()
+        finally:
+            guest.close()
+
+    async def sleeps():
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        await asyncio.gather(*(asyncio.sleep(0.001 * i) for i in range(20)))
+        assert loop.time() - started >= 0.019
+
+    async def threadsafe():
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        threading.Timer(0.01, loop.call_soon_threadsafe, (fut.set_result, 42)).start()
+        assert await fut == 42
+
+    async def sockets():
+        loop = asyncio.get_running_loop()
+        a, b = socket.socketpair()
+        a.setblocking(False)
+        b.setblocking(False)
+        try:
+            for i in range(100):
+                await loop.sock_sendall(a, b'x' * 100)
+                assert len(await loop.sock_recv(b, 100)) == 100
+        finally:
+            a.close()
+            b.close()
+
+    async def cancelled_timers():
+        loop = asyncio.get_running_loop()
+        handles = [loop.call_later(10 + i, lambda: None) for i in range(1000)]
+        for handle in handles[:800]:
+            handle.cancel()
+        await asyncio.sleep(0.001)
+        stats = loop.timer_stats()
+        assert stats['compactions'] >= 1 and stats['scheduled'] == 200, stats
+        for handle in handles[800:]:
+            handle.cancel()
+
+    async def callbacks():
+        loop = asyncio.get_running_loop()
+        for _ in range(50):
+            loop.call_soon(lambda: None)
+        await asyncio.sleep(0)
+
+    def ready_budget():
+        loop = new_guest_event_loop()
+        ran = []
+
+        def slow():
+            busy_until = time.perf_counter() + 0.002
+            while time.perf_counter() < busy_until:
+                pass
+            ran.append(None)
+
+        try:
+            for _ in range(10):
+                loop.call_soon(slow)
+            # 每个回调 2ms、预算 5ms：执行 3 个左右，其余留在 _ready 队首
+            carried = loop.process_ready(0.005)
+            assert 0 < carried < 10 and len(ran) + carried == 10, (carried, len(ran))
+            stats = loop.ready_budget_stats()
+            assert stats['last_carried'] == carried and stats['overrun_ticks'] == 1, stats
+            assert loop.process_ready() == 0 and len(ran) == 10
+        finally:
+            loop.close()
+
+    def push_mode():
+        host = HeadlessHost(coalesce=True)
+        task = asyncio_guest_run(sleeps, run_sync_soon_threadsafe=host.run_sync_soon_threadsafe,
+                                 run_sync_soon_not_threadsafe=host.run_sync_soon_not_threadsafe,
+                                 done_callback=host.done_callback)
+        host.mainloop()
+        if isinstance(host.outcome, BaseException):
+            raise host.outcome
+
+    def runner_reuse():
+        host = HeadlessHost()
+        outcomes = []
+        runner = GuestRunner(host.run_sync_soon_threadsafe)
+
+        def done(outcome):
+            outcomes.append(outcome)
+            if len(outcomes) == 3:
+                host.done_callback(None)
+
+        for _ in range(3):
+            runner.run(callbacks, done_callback=done)
+        host.mainloop()
+        runner.close()
+        assert outcomes == [None] * 3, outcomes
+
+    async def executor_cleanup(cleaned):
+        try:
+            await asyncio.sleep(3600)
+        finally:
+            await asyncio.to_thread(time.sleep, 0.01)
+            cleaned.append(None)
+
+    def close_with_cleanup():
+        # close() 取消任务时 finally 里还要等 executor；完成回调要在 close() 里取走，
+        # 否则要等满 timeout，清理也做不完
+        host = HeadlessHost()
+        cleaned = []
+        runner = GuestRunner(host.run_sync_soon_threadsafe, host.run_sync_soon_not_threadsafe)
+        runner.run(executor_cleanup, cleaned, done_callback=lambda outcome: None)
+
+        def close():
+            started = time.perf_counter()
+            runner.close(timeout=1.0)
+            host.done_callback(time.perf_counter() - started)
+
+        threading.Timer(0.05, host.post_message, (close,)).start()
+        host.mainloop()
+        assert cleaned == [None] and host.outcome < 0.5, (cleaned, host.outcome)
+
+    def backend_failure():
+        # 后端线程失败时 fail_tasks 交付一次结果，之后 close() 取消任务不能再交付一次
+        host = HeadlessHost()
+        outcomes = []
+        runner = GuestRunner(host.run_sync_soon_threadsafe, host.run_sync_soon_not_threadsafe)
+
+        def broken(*args, **kwargs):
+            raise RuntimeError('backend broke')
+
+        def done(outcome):
+            outcomes.append(outcome)
+            host.done_callback(None)
+
+        runner.run(asyncio.sleep, 3600, done_callback=done)
+        runner.loop.poll_events = broken
+        runner.loop.call_soon_threadsafe(lambda: None)
+        host.mainloop()
+        del runner.loop.poll_events
+        runner.close()
+        # 把 close() 投递的消息也处理完
+        host.post_message(lambda: host.done_callback(None))
+        host.mainloop()
+        assert len(outcomes) == 1 and 'backend broke' in str(outcomes[0]), outcomes
+
+    def executor_prewarm():
+        # 空闲许可数应当始终等于空闲的工作线程数，多了 submit 就会排队而不是建线程
+        executor = GuestExecutor(max_workers=4)
+
+        def idle_permits():
+            # 3.12 起新线程和做完任务的线程是自己 release 的，等它们走到阻塞等待
+            time.sleep(0.01)
+            return len(executor._threads), executor._idle_semaphore._value
+
+        try:
+            executor.prewarm(2)
+            executor.prewarm(2)
+            assert idle_permits() == (2, 2), idle_permits()
+            executor.submit(time.sleep, 0).result()
+            executor.prewarm(3)
+            assert idle_permits() == (3, 3), idle_permits()
+            executor.prewarm()
+            assert idle_permits() == (4, 4), idle_permits()
+        finally:
+            executor.shutdown()
+
+    def stock_apis():
+        loop = new_guest_event_loop()
+        try:
+            assert isinstance(loop, asyncio.AbstractEventLoop)
+            assert loop.run_until_complete(asyncio.sleep(0.001, 'ok')) == 'ok'
+        finally:
+            loop.close()
+
+    checks = {
+        'stock run_until_complete': stock_apis,
+        'tick sleeps': lambda: pull(sleeps),
+        'call_soon_threadsafe': lambda: pull(threadsafe),
+        'socket I/O': lambda: pull(sockets),
+        'timer compaction': lambda: pull(cancelled_timers),
+        'HeapTimerStore': lambda: pull(sleeps, timer_store=HeapTimerStore()),
+        'TimingWheel': lambda: pull(sleeps, timer_store=TimingWheel()),
+        'ready budget': ready_budget,
+        'backend thread': push_mode,
+        'GuestRunner reuse': runner_reuse,
+        'close awaits executor': close_with_cleanup,
+        'backend failure': backend_failure,
+        'executor prewarm': executor_prewarm,
+    }
+    if sys.platform.startswith('linux'):
+        from timerfd import TimerFd
+        checks['timerfd'] = lambda: pull(sleeps, timerfd=TimerFd())
+    results = {}
+    for name, check in checks.items():
+        try:
+            check()
+        except Exception as exc:
+            results[name] = f'{type(exc).__name__}: {exc}'
+        else:
+            results[name] = None
+    return results
+
+
+def _startup(python, variant, runs):
+    samples = []
+    for _ in range(runs):
+        proc = subprocess.run([python, '-c', _STARTUP, variant], cwd=_V2_DIR,
+                              capture_output=True, text=True)
+        if proc.returncode != 0:
+            return None
+        samples.append(float(proc.stdout))
+    return statistics.median(samples)
+
+
+def _fmt_ms(value):
+    return f'{value * 1e3:>9.1f}' if value is not None else f'{"-":>9}'
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--pythons', nargs='+', default=[sys.executable],
+                        help='要测试的解释器，找不到的跳过')
+    parser.add_argument('--runs', type=int, default=5, help='启动耗时取中位数的次数')
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        print(json.dumps(_smoke_checks()))
+        return
+
+    failures = {}
+    print(f'{"python":<14} {"version":<8} {"checks":>7} {"subclass":>9} {"hook":>9}  (ms)')
+    for python in args.pythons:
+        exe = shutil.which(python)
+        if exe is None:
+            print(f'{python:<14} not found')
+            continue
+        version = subprocess.run([exe, '-c', 'import platform; print(platform.python_version())'],
+                                 capture_output=True, text=True).stdout.strip()
+        proc = subprocess.run([exe, '-m', 'bench.compat', '--child'], cwd=_V2_DIR,
+                              capture_output=True, text=True)
+        if proc.returncode != 0:
+            passed = 'crash'
+            failures[python] = {'child': proc.stderr.strip().splitlines()[-1:]}
+        else:
+            results = json.loads(proc.stdout)
+            failed = {name: error for name, error in results.items() if error}
+            passed = f'{len(results) - len(failed)}/{len(results)}'
+            if failed:
+                failures[python] = failed
+        print(f'{python:<14} {version:<8} {passed:>7} {_fmt_ms(_startup(exe, "subclass", args.runs))} '
+              f'{_fmt_ms(_startup(exe, "hook", args.runs))}', flush=True)
+    for python, failed in failures.items():
+        for name, error in failed.items():
+            print(f'{python}: {name}: {error}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+"""run_in_executor/getaddrinfo 的完成延迟：asyncio 自带的默认 executor 与 GuestExecutor
+
+每种方式在新进程里新建一个 GuestRunner（进程里第一次解析还要初始化解析器），
+先测第一次调用（自带 executor 这时才创建工作线程），再连续调用 n 次，
+每次之间 sleep gap 秒让后端线程回到阻塞的 select 上，模拟空闲的界面。
+延迟是从 await 开始到协程恢复执行；ticks/call 是每次调用摊到的后端投递的 tick 数。
+guest-cold 不预先启动工作线程，用来区分预热和直接投递各自的效果。
+
+    python -m bench.executor --n 200 --calls noop dns
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from bench.host import HeadlessHost
+from bench.guest_latency import summarize, _fmt
+
+from asyncio_guest_run import GuestRunner
+
+_V2_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _noop():
+    pass
+
+
+async def _calls(call, n, gap, latencies):
+    loop = asyncio.get_running_loop()
+    if call == 'dns':
+        async def once():
+            await loop.getaddrinfo('localhost', 80)
+    else:
+        async def once():
+            await loop.run_in_executor(None, _noop)
+    for _ in range(n + 1):
+        started = time.perf_counter()
+        await once()
+        latencies.append(time.perf_counter() - started)
+        await asyncio.sleep(gap)
+
+
+def run(options, call, n, gap):
+    latencies = []
+    host = HeadlessHost()
+    with contextlib.redirect_stdout(io.StringIO()):
+        runner = GuestRunner(host.run_sync_soon_threadsafe, host.run_sync_soon_not_threadsafe,
+                             **options)
+        task = runner.run(_calls, call, n, gap, latencies, done_callback=host.done_callback)
+        host.mainloop()
+        stats = task.stats()
+        runner.close()
+    if isinstance(host.outcome, BaseException):
+        raise host.outcome
+    return latencies[0], latencies[1:], stats['ticks']
+
+
+def _run_in_child(name, call, n, gap):
+    proc = subprocess.run([sys.executable, '-m', 'bench.executor', '--child', name, call,
+                           '--n', str(n), '--gap', str(gap)],
+                          cwd=_V2_DIR, capture_output=True, text=True, check=True)
+    return json.loads(proc.stdout)
+
+
+MODES = {
+    'stock': {'guest_executor': False},
+    'guest-cold': {'guest_executor': True, 'executor_prewarm': 0},
+    'guest': {'guest_executor': True},
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--n', type=int, default=200, help='第一次之后的调用次数')
+    parser.add_argument('--gap', type=float, default=0.001, help='两次调用之间 sleep 的秒数')
+    parser.add_argument('--calls', nargs='+', choices=['noop', 'dns'], default=['noop', 'dns'],
+                        help='noop: run_in_executor(None, 空函数)；dns: getaddrinfo("localhost")')
+    parser.add_argument('--modes', nargs='+', choices=list(MODES), default=list(MODES))
+    parser.add_argument('--runs', type=int, default=5, help='每种方式的进程数，取中位数')
+    parser.add_argument('--child', nargs=2, metavar=('MODE', 'CALL'), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        name, call = args.child
+        print(json.dumps(run(MODES[name], call, args.n, args.gap)))
+        return
+
+    print(f'{"mode":<10} {"call":<5} {"first":>8} {"p50":>8} {"p99":>8} {"ticks/call":>10}  (ms)')
+    for call in args.calls:
+        for name in args.modes:
+            firsts, rest, ticks = [], [], 0
+            for _ in range(args.runs):
+                first, latencies, run_ticks = _run_in_child(name, call, args.n, args.gap)
+                firsts.append(first)
+                rest.extend(latencies)
+                ticks += run_ticks
+            s = summarize(rest)
+            print(f'{name:<10} {call:<5} {_fmt(statistics.median(firsts))} {_fmt(s["p50"])} '
+                  f'{_fmt(s["p99"])} {ticks / (args.runs * (args.n + 1)):>10.2f}', flush=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+"""GLib 宿主基准：定时器延迟和 CPU 占用
+
+对比两种在 GLib 主循环里运行 guest loop 的方式：
+- idle_add: asyncio_guest_run + 后端线程，tick 经 GLib.idle_add 投递到主线程
+- gsource: gtk_host.glib_guest_run，loop 作为 GSource，没有后端线程
+
+只用 GLib.MainLoop，不需要显示环境：
+
+    python -m bench.gtk_host --duration 2 --idle 2
+"""
+import argparse
+import contextlib
+import io
+
+from bench.guest_latency import _fmt, _measure_cpu, summarize
+
+from gi.repository import GLib
+
+from asyncio_guest_run import asyncio_guest_run
+from gtk_host import glib_guest_run
+
+
+class IdleAddHost:
+    def __init__(self, mainloop):
+        self.mainloop = mainloop
+        self.outcome = None
+
+    def run_sync_soon_threadsafe(self, func):
+        # func 返回 None，只执行一次
+        GLib.idle_add(func, priority=GLib.PRIORITY_DEFAULT)
+
+    def done_callback(self, outcome):
+        self.outcome = outcome
+        self.mainloop.quit()
+
+
+def _start_idle_add(mainloop, args):
+    host = IdleAddHost(mainloop)
+    task = asyncio_guest_run(
+        *args,
+        run_sync_soon_threadsafe=host.run_sync_soon_threadsafe,
+        run_sync_soon_not_threadsafe=host.run_sync_soon_threadsafe,
+        done_callback=host.done_callback,
+    )
+    return task, host
+
+
+def _start_gsource(mainloop, args):
+    host = IdleAddHost(mainloop)
+    return glib_guest_run(*args, done_callback=host.done_callback), host
+
+
+MODES = {
+    'idle_add': _start_idle_add,
+    'gsource': _start_gsource,
+}
+
+
+def run(start, period, duration, traffic_rate, idle):
+    samples, cpu = [], {}
+    mainloop = GLib.MainLoop()
+    with contextlib.redirect_stdout(io.StringIO()):
+        task, host = start(mainloop, (_measure_cpu, period, duration, traffic_rate, idle, samples, cpu))
+        mainloop.run()
+    if isinstance(host.outcome, BaseException):
+        raise host.outcome
+    return samples, cpu
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--duration', type=float, default=2.0, help='探针运行时间（秒）')
+    parser.add_argument('--idle', type=float, default=2.0, help='空闲阶段时间（秒）')
+    parser.add_argument('--period', type=float, default=0.01, help='探针定时器周期（秒）')
+    parser.add_argument('--traffic', type=int, nargs='+', default=[0, 2000],
+                        help='socket 流量（每秒消息数，0 表示关闭）')
+    parser.add_argument('--modes', nargs='+', choices=list(MODES), default=list(MODES))
+    args = parser.parse_args(argv)
+
+    print(f'{"mode":<12} {"traffic":>7} {"n":>6} {"late p50":>8} {"late p99":>8} '
+          f'{"late p999":>9} {"busy cpu":>8} {"idle cpu":>8}  (ms)')
+    for traffic_rate in args.traffic:
+        for name in args.modes:
+            samples, cpu = run(MODES[name], args.period, args.duration, traffic_rate, args.idle)
+            s = summarize(samples)
+            print(f'{name:<12} {traffic_rate:>7} {s["n"]:>6} {_fmt(s["p50"])} {_fmt(s["p99"])} '
+                  f'{_fmt(s["p999"]):>9} {cpu["busy"]:>8.1%} {cpu["idle"]:>8.1%}', flush=True)
+
+
+if __name__ == '__main__':
+    main()
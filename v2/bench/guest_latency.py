@@ -0,0 +1,261 @@
+"""guest mode 定时器延迟/抖动基准
+
+以 example_tasks_asyncio.check_latency 为探针，在无窗口宿主 (bench.host.HeadlessHost)
+上运行 asyncio_guest_run，扫描定时器周期、宿主线程 CPU 负载和 socket 流量，
+输出定时器迟到时间与宿主派发延迟的 p50/p99/p999，并与普通 asyncio.run 对比。
+
+    python -m bench.guest_latency --duration 2 --json latency.json
+"""
+import argparse
+import asyncio
+import contextlib
+import functools
+import json
+import math
+import os
+import socket
+import sys
+import threading
+import time
+
+from bench.host import HeadlessHost
+
+from asyncio_guest_run import asyncio_guest_run
+from example_tasks_asyncio import check_latency
+from timer_store import HeapTimerStore, TimingWheel
+from timerfd import TimerFd
+
+
+def percentile(samples, q):
+    """nearest-rank 百分位，samples 需已排序"""
+    if not samples:
+        return math.nan
+    index = max(0, min(len(samples) - 1, math.ceil(q * len(samples)) - 1))
+    return samples[index]
+
+
+def summarize(samples):
+    ordered = sorted(samples)
+    return {
+        'n': len(ordered),
+        'p50': percentile(ordered, 0.50),
+        'p99': percentile(ordered, 0.99),
+        'p999': percentile(ordered, 0.999),
+    }
+
+
+class SocketTraffic:
+    """后台线程按固定速率往 socketpair 写数据，由被测 loop 的 reader 回调读走"""
+
+    def __init__(self, rate=2000, size=512):
+        self.rate = rate
+        self.payload = b'x' * size
+        self.received = 0
+        self._stop = threading.Event()
+        self._thread = None
+        self._rsock = self._wsock = None
+
+    def start(self, loop):
+        self._rsock, self._wsock = socket.socketpair()
+        self._rsock.setblocking(False)
+        self._wsock.settimeout(0.1)
+        loop.add_reader(self._rsock.fileno(), self._drain)
+        self._thread = threading.Thread(target=self._send_loop, daemon=True)
+        self._thread.start()
+
+    def stop(self, loop):
+        self._stop.set()
+        self._thread.join()
+        loop.remove_reader(self._rsock.fileno())
+        self._rsock.close()
+        self._wsock.close()
+
+    def _drain(self):
+        try:
+            while True:
+                data = self._rsock.recv(65536)
+                if not data:
+                    break
+                self.received += len(data)
+        except BlockingIOError:
+            pass
+
+    def _send_loop(self):
+        interval = 1 / self.rate
+        deadline = time.perf_counter()
+        while not self._stop.is_set():
+            try:
+                self._wsock.send(self.payload)
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            deadline += interval
+            delay = deadline - time.perf_counter()
+            if delay > 0:
+                self._stop.wait(delay)
+
+
+def _burn_periodically(loop, load, load_slice=0.01):
+    """在 loop 线程上模拟与 HeadlessHost 相同的 CPU 负载，供 asyncio.run 基线使用"""
+    handle = None
+
+    def burn():
+        nonlocal handle
+        busy_until = time.perf_counter() + load * load_slice
+        while time.perf_counter() < busy_until:
+            pass
+        handle = loop.call_later((1 - load) * load_slice, burn)
+
+    if load:
+        handle = loop.call_soon(burn)
+    return lambda: handle and handle.cancel()
+
+
+async def _probe(period, duration, traffic_rate, load, samples):
+    loop = asyncio.get_running_loop()
+    traffic = SocketTraffic(traffic_rate) if traffic_rate else None
+    stop_burn = _burn_periodically(loop, load) if load else None
+    if traffic:
+        traffic.start(loop)
+    try:
+        await check_latency(period=period, duration=duration, report=samples.append)
+    finally:
+        if traffic:
+            traffic.stop(loop)
+        if stop_burn:
+            stop_burn()
+
+
+async def _measure_cpu(period, duration, traffic_rate, idle, samples, cpu):
+    """先跑 duration 秒探针，再空闲 idle 秒，分别记录进程 CPU 时间占墙钟时间的比例"""
+    started, cpu_started = time.perf_counter(), time.process_time()
+    await _probe(period, duration, traffic_rate, 0.0, samples)
+    cpu['busy'] = (time.process_time() - cpu_started) / (time.perf_counter() - started)
+    started, cpu_started = time.perf_counter(), time.process_time()
+    await asyncio.sleep(idle)
+    cpu['idle'] = (time.process_time() - cpu_started) / (time.perf_counter() - started)
+
+
+def run_baseline(period, duration, load, traffic_rate, host_options=None):
+    """普通 asyncio.run；宿主的帧和卡顿没有对应物，host_options 被忽略"""
+    samples = []
+    asyncio.run(_probe(period, duration, traffic_rate, load, samples))
+    return samples, [], None
+
+
+def run_guest(period, duration, load, traffic_rate, host_options=None, coalesce=False,
+              ready_budget=None, timer_store=None, timerfd=None, pipeline=False):
+    """host_options: 传给 HeadlessHost 的帧率/绘制耗时/卡顿等参数"""
+    samples = []
+    host = HeadlessHost(load=load, coalesce=coalesce, **(host_options or {}))
+    # 负载由宿主线程模拟，探针里不再重复
+    task = asyncio_guest_run(
+        _probe, period, duration, traffic_rate, 0.0, samples,
+        run_sync_soon_threadsafe=host.run_sync_soon_threadsafe,
+        run_sync_soon_not_threadsafe=host.run_sync_soon_not_threadsafe,
+        done_callback=host.done_callback,
+        ready_budget=ready_budget,
+        timer_store=timer_store() if timer_store else None,
+        timerfd=timerfd() if timerfd else None,
+        pipeline=pipeline,
+    )
+    host.mainloop()
+    if isinstance(host.outcome, BaseException):
+        raise host.outcome
+    return samples, host.dispatch_lags, host
+
+
+RUNNERS = {
+    'asyncio.run': run_baseline,
+    'guest': run_guest,
+    'guest+batch': functools.partial(run_guest, coalesce=True),
+    'guest+pipeline': functools.partial(run_guest, pipeline=True),
+}
+
+
+def _fmt(seconds):
+    return f'{"-":>8}' if math.isnan(seconds) else f'{seconds * 1e3:8.3f}'
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--duration', type=float, default=2.0,
+                        help='每个配置的运行时间（秒）')
+    parser.add_argument('--periods', type=float, nargs='+', default=[0.001, 0.01, 0.05],
+                        help='check_latency 的定时器周期（秒）')
+    parser.add_argument('--loads', type=float, nargs='+', default=[0.0, 0.5],
+                        help='宿主线程 CPU 负载比例（忙等 load*10ms / 10ms 帧）')
+    parser.add_argument('--traffic', type=int, nargs='+', default=[0, 2000],
+                        help='socket 流量（每秒消息数，0 表示关闭）')
+    parser.add_argument('--modes', nargs='+', choices=list(RUNNERS),
+                        default=['asyncio.run', 'guest'])
+    parser.add_argument('--json', help='把结果写入 JSON 文件，便于跟踪回归')
+    parser.add_argument('--show-guest-output', action='store_true',
+                        help='保留被测代码的 stdout 输出')
+    parser.add_argument('--ready-budget', type=float,
+                        help='guest 模式每个 tick 执行就绪回调的预算（毫秒）')
+    parser.add_argument('--timer-store', choices=['heap', 'wheel'],
+                        help='guest 模式使用的定时器存储，默认是 loop 自带的 _scheduled 堆')
+    parser.add_argument('--timerfd', type=float, metavar='SPIN',
+                        help='guest 模式用 timerfd 唤醒定时器（仅 Linux），参数为忙等时间（微秒），0 表示不忙等')
+    parser.add_argument('--fps', type=float, help='宿主帧率，与 --loads 二选一')
+    parser.add_argument('--render', type=float, default=0.0, help='宿主每帧绘制耗时（毫秒）')
+    parser.add_argument('--stall-interval', type=float,
+                        help='宿主平均每隔多少秒注入一次输入处理卡顿')
+    parser.add_argument('--stall', type=float, default=0.0, help='每次卡顿的时长（毫秒）')
+    args = parser.parse_args(argv)
+    host_options = {'fps': args.fps, 'render': args.render / 1e3,
+                    'stall_interval': args.stall_interval, 'stall': args.stall / 1e3}
+    if args.fps is not None:
+        args.loads = [0.0]
+    if args.ready_budget is not None:
+        for mode in ('guest', 'guest+batch', 'guest+pipeline'):
+            RUNNERS[mode] = functools.partial(RUNNERS[mode], ready_budget=args.ready_budget / 1e3)
+    if args.timer_store is not None:
+        store = {'heap': HeapTimerStore, 'wheel': TimingWheel}[args.timer_store]
+        for mode in ('guest', 'guest+batch', 'guest+pipeline'):
+            RUNNERS[mode] = functools.partial(RUNNERS[mode], timer_store=store)
+    if args.timerfd is not None:
+        timerfd = functools.partial(TimerFd, spin=args.timerfd / 1e6)
+        for mode in ('guest', 'guest+batch', 'guest+pipeline'):
+            RUNNERS[mode] = functools.partial(RUNNERS[mode], timerfd=timerfd)
+
+    header = (f'{"mode":<14} {"period":>7} {"load":>5} {"traffic":>7} {"n":>6} '
+              f'{"late p50":>8} {"late p99":>8} {"late p999":>9} '
+              f'{"lag p50":>8} {"lag p99":>8} {"lag p999":>8} '
+              f'{"frame p99":>9} {"dropped":>7}  (ms)')
+    print(header)
+    results = []
+    for period in args.periods:
+        for load in args.loads:
+            for traffic_rate in args.traffic:
+                for mode in args.modes:
+                    runner = RUNNERS[mode]
+                    with contextlib.ExitStack() as stack:
+                        if not args.show_guest_output:
+                            devnull = stack.enter_context(open(os.devnull, 'w'))
+                            stack.enter_context(contextlib.redirect_stdout(devnull))
+                        lateness, lags, host = runner(period, args.duration, load, traffic_rate,
+                                                      host_options)
+                    late, lag = summarize(lateness), summarize(lags)
+                    frame = summarize(host.frame_lags if host else [])
+                    dropped = host.dropped_frames if host else 0
+                    results.append({
+                        'mode': mode, 'period': period, 'load': load,
+                        'traffic': traffic_rate, 'lateness': late, 'dispatch_lag': lag,
+                        'frame_lag': frame, 'dropped_frames': dropped,
+                    })
+                    print(f'{mode:<14} {period:>7g} {load:>5g} {traffic_rate:>7} {late["n"]:>6} '
+                          f'{_fmt(late["p50"])} {_fmt(late["p99"])} {_fmt(late["p999"]):>9} '
+                          f'{_fmt(lag["p50"])} {_fmt(lag["p99"])} {_fmt(lag["p999"])} '
+                          f'{_fmt(frame["p99"]):>9} {dropped:>7}',
+                          flush=True)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'python': sys.version, 'results': results}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""UI 线程与后端线程的交接：threading.Semaphore 与 eventfd 的每 tick 开销
+
+负载是一条 await asyncio.sleep(0) 链，每一步都要经过一次完整的
+后端轮询 -> 投递 -> UI tick -> 交接，所以单位时间的 tick 数基本由交接开销决定。
+用 /proc/self/task/<tid>/status 统计宿主线程和后端线程每个 tick 的主动/被动上下文切换；
+GIL 争用导致的等待也表现为主动切换（在 GIL 的 futex 上睡眠）。仅 Linux。
+
+    python -m bench.handoff --duration 2
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import threading
+import time
+
+from bench.host import HeadlessHost
+
+from asyncio_guest_run import GuestRunner
+import handoff
+
+
+def _ctxt_switches(native_id):
+    counts = {}
+    with open(f'/proc/self/task/{native_id}/status') as f:
+        for line in f:
+            if line.startswith(('voluntary_ctxt_switches', 'nonvoluntary_ctxt_switches')):
+                name, value = line.split(':')
+                counts[name] = int(value)
+    return counts['voluntary_ctxt_switches'], counts['nonvoluntary_ctxt_switches']
+
+
+async def _chain(duration):
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + duration
+    steps = 0
+    while loop.time() < deadline:
+        await asyncio.sleep(0)
+        steps += 1
+    return steps
+
+
+def run(kind, duration, pipeline):
+    host = HeadlessHost()
+    ui = threading.get_native_id()
+    with contextlib.redirect_stdout(io.StringIO()):
+        runner = GuestRunner(host.run_sync_soon_threadsafe, host.run_sync_soon_not_threadsafe,
+                             handoff=kind, pipeline=pipeline)
+        backend = runner._backend.native_id
+        before = _ctxt_switches(ui), _ctxt_switches(backend)
+        started = time.perf_counter()
+        task = runner.run(_chain, duration, done_callback=host.done_callback)
+        host.mainloop()
+        elapsed = time.perf_counter() - started
+        after = _ctxt_switches(ui), _ctxt_switches(backend)
+        stats = task.stats()
+        runner.close()
+    if isinstance(host.outcome, BaseException):
+        raise host.outcome
+    ticks = stats['ticks']
+    return {
+        'ticks': ticks,
+        'tick_us': elapsed / ticks * 1e6,
+        'ui': [(b - a) / ticks for a, b in zip(before[0], after[0])],
+        'backend': [(b - a) / ticks for a, b in zip(before[1], after[1])],
+        'release_us': stats['ui_sem_release']['mean'] * 1e6,
+        'wait_us': stats['backend_sem_wait']['mean'] * 1e6,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--duration', type=float, default=2.0, help='每种方式的运行时间（秒）')
+    parser.add_argument('--pipeline', action='store_true', help='同时测流水线模式')
+    args = parser.parse_args(argv)
+    kinds = ['semaphore', 'eventfd'] if handoff.AVAILABLE else ['semaphore']
+
+    print(f'{"handoff":<10} {"pipeline":>8} {"ticks":>7} {"us/tick":>7} {"release":>7} '
+          f'{"ui vcsw":>7} {"ui ivcsw":>8} {"be vcsw":>7} {"be ivcsw":>8}  (per tick)')
+    for pipeline in ((False, True) if args.pipeline else (False,)):
+        for kind in kinds:
+            r = run(kind, args.duration, pipeline)
+            print(f'{kind:<10} {str(pipeline):>8} {r["ticks"]:>7} {r["tick_us"]:>7.1f} '
+                  f'{r["release_us"]:>7.2f} {r["ui"][0]:>7.2f} {r["ui"][1]:>8.2f} '
+                  f'{r["backend"][0]:>7.2f} {r["backend"][1]:>8.2f}', flush=True)
+
+
+if __name__ == '__main__':
+    main()
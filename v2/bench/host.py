@@ -0,0 +1,117 @@
+import collections
+import random
+import threading
+import time
+
+from dispatcher import CoalescingDispatcher
+
+
+def _burn(seconds):
+    busy_until = time.perf_counter() + seconds
+    while time.perf_counter() < busy_until:
+        pass
+
+
+class HeadlessHost:
+    """无窗口的确定性宿主，用单线程消息队列模拟 GUI 消息循环
+
+    所有 asyncio_guest_run 性能测量的标准宿主，不依赖 Win32 或显示环境。
+
+    fps: 帧率，每帧在宿主线程上忙等 render 秒模拟绘制；None 表示没有帧
+    render: 每帧的绘制耗时（秒）
+    stall_interval: 平均每隔多少秒注入一次输入处理卡顿（指数分布，按 seed 可复现）；
+        None 表示不注入
+    stall: 每次卡顿在宿主线程上忙等的时间（秒）
+    load, load_slice: 旧的写法，等价于 fps=1/load_slice, render=load*load_slice
+    coalesce: 经 CoalescingDispatcher 合并跨线程回调，一批只投递一条消息
+
+    run_sync_soon_not_threadsafe 只能在宿主线程上调用，放进单独的 deque，不加锁也不
+    notify；mainloop 按投递时间把两个队列合成一个先进先出的消息队列。
+    """
+
+    def __init__(self, load=0.0, load_slice=0.01, coalesce=False, fps=None, render=0.0,
+                 stall_interval=None, stall=0.0, seed=0):
+        if not 0.0 <= load < 1.0:
+            raise ValueError(f'load must be in [0, 1), got {load!r}')
+        if load:
+            fps, render = 1.0 / load_slice, load * load_slice
+        if fps is not None and not 0.0 <= render * fps < 1.0:
+            raise ValueError(f'render ({render!r}s) must fit in a frame at {fps!r} fps')
+        self.frame_period = 1.0 / fps if fps else None
+        self.render = render
+        self.stall_interval = stall_interval
+        self.stall = stall
+        self._rng = random.Random(seed)
+        self.outcome = None
+        # run_sync_soon_* 调用到宿主线程真正执行之间的延迟（秒）
+        self.dispatch_lags = []
+        # 每帧实际开始时间比计划晚了多少（秒），以及因为太晚而跳过的帧数
+        self.frame_lags = []
+        self.dropped_frames = 0
+        self.stalls = 0
+        self._queue = collections.deque()
+        # 只有宿主线程读写
+        self._local = collections.deque()
+        self._cond = threading.Condition()
+        self._running = False
+        self.dispatcher = CoalescingDispatcher(self.post_message) if coalesce else None
+
+    def post_message(self, func):
+        with self._cond:
+            self._queue.append((time.perf_counter(), func))
+            self._cond.notify()
+
+    def run_sync_soon_threadsafe(self, func):
+        if self.dispatcher is not None:
+            self.dispatcher.run_sync_soon_threadsafe(func)
+        else:
+            self.post_message(func)
+
+    def run_sync_soon_not_threadsafe(self, func):
+        self._local.append((time.perf_counter(), func))
+
+    def done_callback(self, outcome):
+        self.outcome = outcome
+        self._running = False
+
+    def _next_stall(self, now):
+        return now + self._rng.expovariate(1.0 / self.stall_interval)
+
+    def mainloop(self):
+        self._running = True
+        now = time.perf_counter()
+        next_frame = now if self.frame_period else None
+        next_stall = self._next_stall(now) if self.stall_interval else None
+        while self._running:
+            now = time.perf_counter()
+            if next_frame is not None and now >= next_frame:
+                # 绘制、卡顿或消息处理拖过了整帧，跳过错过的帧，不补帧
+                missed = int((now - next_frame) / self.frame_period)
+                if missed:
+                    self.dropped_frames += missed
+                    next_frame += missed * self.frame_period
+                self.frame_lags.append(now - next_frame)
+                _burn(self.render)
+                next_frame += self.frame_period
+            if next_stall is not None and now >= next_stall:
+                self.stalls += 1
+                _burn(self.stall)
+                next_stall = self._next_stall(time.perf_counter())
+            local, queue = self._local, self._queue
+            # 其他线程只会往 _queue 追加，不加锁读队首也不会被取走
+            if local and not (queue and queue[0][0] < local[0][0]):
+                posted, func = local.popleft()
+            else:
+                with self._cond:
+                    if not queue:
+                        timeout = None
+                        for wake in (next_frame, next_stall):
+                            if wake is not None:
+                                remaining = max(0.0, wake - time.perf_counter())
+                                timeout = remaining if timeout is None else min(timeout, remaining)
+                        self._cond.wait(timeout)
+                    if not queue:
+                        continue
+                    posted, func = queue.popleft()
+            self.dispatch_lags.append(time.perf_counter() - posted)
+            func()
@@ -0,0 +1,210 @@
+"""严格交替与流水线轮询 (pipeline=True) 的 socket 吞吐量对比
+
+conns 个 socketpair，另一端由一个子进程回显；guest loop 上每个连接一个任务，
+通过 stream 不停地一来一回，每收到一条回复在 UI 线程上忙等 work 秒模拟处理。
+统计每秒往返次数、往返延迟和每条消息摊到的 tick 数。
+之后用 add_reader 直接读 socket 做重复就绪检查：后端线程每次 select 返回后停一会儿，
+回显也延后，让 UI 线程在这期间处理完上一批；spurious 是回调被调用时没有数据可读的次数，
+两种模式都应该是 0。
+
+    python -m bench.pipeline --conns 16 --work 20
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+from bench.host import HeadlessHost
+from bench.guest_latency import summarize, _fmt
+
+from asyncio_guest_run import asyncio_guest_run
+
+
+# 回显服务器跑在单独的进程里，不和 guest loop 抢 GIL，往返时间是真正的 I/O 等待
+_ECHO = '''
+import selectors, socket, sys, time
+delay = float(sys.argv[1])
+sel = selectors.DefaultSelector()
+for fd in sys.argv[2:]:
+    sel.register(socket.socket(fileno=int(fd)), selectors.EVENT_READ)
+while sel.get_map():
+    for key, _ in sel.select():
+        try:
+            data = key.fileobj.recv(65536)
+            if data:
+                if delay:
+                    time.sleep(delay)
+                key.fileobj.sendall(data)
+        except OSError:
+            # 重复就绪检查结束时 guest 这边不等回复就关闭 socket
+            data = b''
+        if not data:
+            sel.unregister(key.fileobj)
+            key.fileobj.close()
+'''
+
+
+async def _clients(conns, size, work, duration, rtts):
+    loop = asyncio.get_running_loop()
+    payload = b'x' * size
+    deadline = loop.time() + duration
+
+    async def client(sock):
+        # 走 transport：每条回复都经过一次 selector 事件和 _read_ready 回调
+        reader, writer = await asyncio.open_connection(sock=sock)
+        while loop.time() < deadline:
+            sent = time.perf_counter()
+            writer.write(payload)
+            await reader.readexactly(size)
+            busy_until = time.perf_counter() + work
+            while time.perf_counter() < busy_until:
+                pass
+            rtts.append(time.perf_counter() - sent)
+        writer.close()
+
+    socks, echo = _echo_pairs(conns)
+    try:
+        await asyncio.gather(*(client(sock) for sock in socks))
+    finally:
+        for sock in socks:
+            sock.close()
+        echo.wait()
+
+
+def _echo_pairs(conns, delay=0.0):
+    """conns 个非阻塞的 socket，另一端交给回显子进程，每次回显前等 delay 秒"""
+    socks, theirs = [], []
+    for _ in range(conns):
+        ours, peer = socket.socketpair()
+        ours.setblocking(False)
+        socks.append(ours)
+        theirs.append(peer)
+    fds = [peer.fileno() for peer in theirs]
+    echo = subprocess.Popen([sys.executable, '-c', _ECHO, str(delay), *map(str, fds)], pass_fds=fds)
+    for peer in theirs:
+        peer.close()
+    return socks, echo
+
+
+async def _readers(conns, size, work, duration, stall, delay, counts):
+    # 直接用 add_reader：同一个就绪被投递两次时，第二次回调 recv 会遇到 BlockingIOError
+    loop = asyncio.get_running_loop()
+    payload = b'x' * size
+    ui_thread = threading.get_ident()
+    poll_events = loop.poll_events
+
+    # 后端线程 select 返回后停 stall 秒，模拟它刚醒来就被换下 CPU：
+    # UI 线程正好在这段时间里处理完上一批、读走数据
+    def stalled_poll_events(*args, **kwargs):
+        events = poll_events(*args, **kwargs)
+        if events and threading.get_ident() != ui_thread:
+            time.sleep(stall)
+        return events
+
+    loop.poll_events = stalled_poll_events
+
+    def on_readable(sock, received):
+        try:
+            data = sock.recv(65536)
+        except BlockingIOError:
+            counts['spurious'] += 1
+            return
+        counts['reads'] += 1
+        busy_until = time.perf_counter() + work
+        while time.perf_counter() < busy_until:
+            pass
+        received[0] += len(data)
+        if received[0] >= size:
+            received[0] -= size
+            sock.send(payload)
+
+    socks, echo = _echo_pairs(conns, delay)
+    try:
+        for sock in socks:
+            loop.add_reader(sock, on_readable, sock, [0])
+            sock.send(payload)
+        await asyncio.sleep(duration)
+    finally:
+        for sock in socks:
+            loop.remove_reader(sock)
+            sock.close()
+        echo.wait()
+
+
+def _guest_run(pipeline, async_func, *args):
+    host = HeadlessHost()
+    with contextlib.redirect_stdout(io.StringIO()):
+        task = asyncio_guest_run(
+            async_func, *args,
+            run_sync_soon_threadsafe=host.run_sync_soon_threadsafe,
+            run_sync_soon_not_threadsafe=host.run_sync_soon_not_threadsafe,
+            done_callback=host.done_callback,
+            pipeline=pipeline,
+        )
+        host.mainloop()
+    if isinstance(host.outcome, BaseException):
+        raise host.outcome
+    return task.stats()
+
+
+def run(pipeline, conns, size, work, duration):
+    rtts = []
+    stats = _guest_run(pipeline, _clients, conns, size, work, duration, rtts)
+    return rtts, stats
+
+
+def check_readiness(pipeline, conns, size, work, duration, stall=0.0005, delay=0.002):
+    """重复就绪检查：返回 (读到数据的回调次数, 没有数据可读的回调次数)
+
+    回显前等 delay 秒，重复投递的就绪在新数据到达之前执行，一定读不到数据。
+    """
+    counts = {'reads': 0, 'spurious': 0}
+    _guest_run(pipeline, _readers, conns, size, work, duration, stall, delay, counts)
+    return counts['reads'], counts['spurious']
+
+
+MODES = {
+    'strict': False,
+    'pipeline': True,
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--duration', type=float, default=2.0, help='运行时间（秒）')
+    parser.add_argument('--conns', type=int, nargs='+', default=[1, 16], help='连接数')
+    parser.add_argument('--size', type=int, default=256, help='每条消息的字节数')
+    parser.add_argument('--work', type=float, nargs='+', default=[0, 20],
+                        help='每条回复在 UI 线程上的处理耗时（微秒）')
+    parser.add_argument('--modes', nargs='+', choices=list(MODES), default=list(MODES))
+    parser.add_argument('--check-conns', type=int, default=64, help='重复就绪检查的连接数')
+    parser.add_argument('--check-work', type=float, default=5,
+                        help='重复就绪检查里每次读到数据后 UI 线程的处理耗时（微秒）')
+    args = parser.parse_args(argv)
+
+    print(f'{"mode":<9} {"conns":>5} {"work us":>7} {"msg/s":>8} {"rtt p50":>8} {"rtt p99":>8} '
+          f'{"ticks/msg":>9} {"events/poll":>11}  (ms)')
+    for conns in args.conns:
+        for work in args.work:
+            for name in args.modes:
+                rtts, stats = run(MODES[name], conns, args.size, work / 1e6, args.duration)
+                s = summarize(rtts)
+                print(f'{name:<9} {conns:>5} {work:>7g} {s["n"] / args.duration:>8.0f} '
+                      f'{_fmt(s["p50"])} {_fmt(s["p99"])} {stats["ticks"] / max(s["n"], 1):>9.2f} '
+                      f'{stats["events_per_poll"]["mean"]:>11.2f}', flush=True)
+
+    # 流水线模式下后端线程的轮询和 UI 处理上一批重叠，同一个就绪不能投递两次
+    print(f'\n{"mode":<9} {"conns":>5} {"reads":>8} {"spurious":>8}')
+    for name in args.modes:
+        reads, spurious = check_readiness(MODES[name], args.check_conns, args.size,
+                                          args.check_work / 1e6, args.duration)
+        print(f'{name:<9} {args.check_conns:>5} {reads:>8} {spurious:>8}', flush=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+"""拉模式 (GuestLoop.tick) 与推模式 (asyncio_guest_run + 后端线程) 的对比
+
+拉模式下宿主是一个按帧节奏运行的循环：每帧忙等 render 秒模拟绘制，每轮 tick 一次，
+再按 tick 返回的超时和到下一帧的时间中较小的一个睡眠。推模式用负载相同的 HeadlessHost。
+两者都用 check_latency 探针统计定时器迟到时间和进程 CPU 占用。
+
+    python -m bench.pull_mode --fps 60 --render 0.004
+"""
+import argparse
+import contextlib
+import io
+import time
+
+from bench.guest_latency import _fmt, _measure_cpu, summarize
+from bench.host import HeadlessHost
+
+from asyncio_guest_run import GuestLoop, asyncio_guest_run
+
+
+def run_pull(period, duration, traffic_rate, idle, fps, render, budget):
+    samples, cpu = [], {}
+    frame = 1.0 / fps
+    with contextlib.redirect_stdout(io.StringIO()):
+        guest = GuestLoop(_measure_cpu, period, duration, traffic_rate, idle, samples, cpu)
+        next_frame = time.perf_counter()
+        while not guest.done():
+            now = time.perf_counter()
+            if now >= next_frame:
+                busy_until = now + render
+                while time.perf_counter() < busy_until:
+                    pass
+                next_frame = max(next_frame + frame, now)
+            timeout = guest.tick(budget)
+            # 按下一帧和下一个 asyncio 截止时间中较早的一个睡眠
+            wait = next_frame - time.perf_counter()
+            if timeout is not None:
+                wait = min(wait, timeout)
+            if wait > 0:
+                time.sleep(wait)
+    exc = guest.task.exception()
+    guest.close()
+    if exc is not None:
+        raise exc
+    return samples, cpu
+
+
+def run_push(period, duration, traffic_rate, idle, fps, render, budget):
+    samples, cpu = [], {}
+    host = HeadlessHost(fps=fps, render=render)
+    with contextlib.redirect_stdout(io.StringIO()):
+        task = asyncio_guest_run(
+            _measure_cpu, period, duration, traffic_rate, idle, samples, cpu,
+            run_sync_soon_threadsafe=host.run_sync_soon_threadsafe,
+            run_sync_soon_not_threadsafe=host.run_sync_soon_not_threadsafe,
+            done_callback=host.done_callback,
+            ready_budget=budget,
+        )
+        host.mainloop()
+    if isinstance(host.outcome, BaseException):
+        raise host.outcome
+    return samples, cpu
+
+
+MODES = {
+    'pull': run_pull,
+    'push': run_push,
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--duration', type=float, default=2.0, help='探针运行时间（秒）')
+    parser.add_argument('--idle', type=float, default=1.0, help='空闲阶段时间（秒）')
+    parser.add_argument('--period', type=float, default=0.01, help='探针定时器周期（秒）')
+    parser.add_argument('--traffic', type=int, nargs='+', default=[0, 2000],
+                        help='socket 流量（每秒消息数，0 表示关闭）')
+    parser.add_argument('--fps', type=float, default=60.0)
+    parser.add_argument('--render', type=float, default=0.004, help='每帧绘制耗时（秒）')
+    parser.add_argument('--budget', type=float, default=4.0,
+                        help='每次 tick 执行就绪回调的预算（毫秒）')
+    parser.add_argument('--modes', nargs='+', choices=list(MODES), default=list(MODES))
+    args = parser.parse_args(argv)
+
+    print(f'{"mode":<6} {"traffic":>7} {"n":>6} {"late p50":>8} {"late p99":>8} '
+          f'{"late p999":>9} {"busy cpu":>8} {"idle cpu":>8}  (ms)')
+    for traffic_rate in args.traffic:
+        for name in args.modes:
+            samples, cpu = MODES[name](args.period, args.duration, traffic_rate, args.idle,
+                                       args.fps, args.render, args.budget / 1e3)
+            s = summarize(samples)
+            print(f'{name:<6} {traffic_rate:>7} {s["n"]:>6} {_fmt(s["p50"])} {_fmt(s["p99"])} '
+                  f'{_fmt(s["p999"]):>9} {cpu["busy"]:>8.1%} {cpu["idle"]:>8.1%}', flush=True)
+
+
+if __name__ == '__main__':
+    main()
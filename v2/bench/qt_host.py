@@ -0,0 +1,107 @@
+"""Qt 宿主基准：定时器延迟和 CPU 占用
+
+对比两种在 Qt 事件循环里驱动 guest loop 的方式：
+- timer0: v1 的做法，间隔为 0 的 QTimer 不停地做非阻塞 tick
+- notifier: qt_host.qt_guest_run，QSocketNotifier + 单次 QTimer，只在有事时 tick
+
+默认使用 offscreen 平台插件，不需要显示环境：
+
+    python -m bench.qt_host --duration 2 --idle 2
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+
+from bench.guest_latency import _fmt, _measure_cpu, summarize
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+from PyQt5.QtCore import QTimer
+from PyQt5.QtWidgets import QApplication
+
+from asyncio_guest_run import GuestTask
+from guest_events import new_guest_event_loop
+from qt_host import qt_guest_run
+
+
+class _Host:
+    def __init__(self, app):
+        self.app = app
+        self.outcome = None
+
+    def done_callback(self, outcome):
+        self.outcome = outcome
+        self.app.quit()
+
+
+def _start_timer0(app, args):
+    host = _Host(app)
+    loop = new_guest_event_loop()
+    asyncio.set_event_loop(loop)
+    asyncio._set_running_loop(loop)
+    timer = QTimer(app)
+
+    def tick():
+        loop.process_events(loop._selector.select(0))
+        loop.process_ready()
+
+    def on_task_done(fut):
+        timer.stop()
+        host.done_callback(fut.exception() or fut.result())
+
+    timer.timeout.connect(tick)
+    task = GuestTask(args[0](*args[1:]), loop=loop)
+    task.add_done_callback(on_task_done)
+    timer.start(0)
+    return task, host
+
+
+def _start_notifier(app, args):
+    host = _Host(app)
+    return qt_guest_run(*args, done_callback=host.done_callback), host
+
+
+MODES = {
+    'timer0': _start_timer0,
+    'notifier': _start_notifier,
+}
+
+
+def run(app, start, period, duration, traffic_rate, idle):
+    samples, cpu = [], {}
+    with contextlib.redirect_stdout(io.StringIO()):
+        task, host = start(app, (_measure_cpu, period, duration, traffic_rate, idle, samples, cpu))
+        app.exec_()
+    loop = task.get_loop()
+    asyncio._set_running_loop(None)
+    asyncio.set_event_loop(None)
+    loop.close()
+    if isinstance(host.outcome, BaseException):
+        raise host.outcome
+    return samples, cpu
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--duration', type=float, default=2.0, help='探针运行时间（秒）')
+    parser.add_argument('--idle', type=float, default=2.0, help='空闲阶段时间（秒）')
+    parser.add_argument('--period', type=float, default=0.01, help='探针定时器周期（秒）')
+    parser.add_argument('--traffic', type=int, nargs='+', default=[0, 2000],
+                        help='socket 流量（每秒消息数，0 表示关闭）')
+    parser.add_argument('--modes', nargs='+', choices=list(MODES), default=list(MODES))
+    args = parser.parse_args(argv)
+
+    app = QApplication.instance() or QApplication([])
+    print(f'{"mode":<12} {"traffic":>7} {"n":>6} {"late p50":>8} {"late p99":>8} '
+          f'{"late p999":>9} {"busy cpu":>8} {"idle cpu":>8}  (ms)')
+    for traffic_rate in args.traffic:
+        for name in args.modes:
+            samples, cpu = run(app, MODES[name], args.period, args.duration, traffic_rate, args.idle)
+            s = summarize(samples)
+            print(f'{name:<12} {traffic_rate:>7} {s["n"]:>6} {_fmt(s["p50"])} {_fmt(s["p99"])} '
+                  f'{_fmt(s["p999"]):>9} {cpu["busy"]:>8.1%} {cpu["idle"]:>8.1%}', flush=True)
+
+
+if __name__ == '__main__':
+    main()
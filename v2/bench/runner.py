@@ -0,0 +1,105 @@
+"""连续提交短任务：每次 asyncio_guest_run 与复用同一个 GuestRunner 的对比
+
+宿主线程上依次提交 n 个短任务（await sleep(0) 后返回），上一个的 done_callback 里
+提交下一个。统计从提交到协程第一步开始执行的时间（fresh 包含新建 loop 和后端线程）、
+每个任务从提交到 done_callback 的平均耗时，以及结束时多出来的线程数。
+
+    python -m bench.runner --jobs 500
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import threading
+import time
+
+from bench.host import HeadlessHost
+from bench.guest_latency import summarize, _fmt
+
+from asyncio_guest_run import GuestRunner, asyncio_guest_run
+
+
+async def _job(submitted, first_steps):
+    first_steps.append(time.perf_counter() - submitted)
+    await asyncio.sleep(0)
+
+
+def run_fresh(jobs):
+    host = HeadlessHost()
+    first_steps = []
+    remaining = jobs
+
+    def submit():
+        asyncio_guest_run(
+            _job, time.perf_counter(), first_steps,
+            run_sync_soon_threadsafe=host.run_sync_soon_threadsafe,
+            run_sync_soon_not_threadsafe=host.run_sync_soon_not_threadsafe,
+            done_callback=done,
+        )
+
+    def done(outcome):
+        nonlocal remaining
+        remaining -= 1
+        if isinstance(outcome, BaseException) or not remaining:
+            host.done_callback(outcome)
+        else:
+            submit()
+
+    host.post_message(submit)
+    host.mainloop()
+    return host.outcome, first_steps
+
+
+def run_runner(jobs):
+    host = HeadlessHost()
+    first_steps = []
+    remaining = jobs
+    runner = GuestRunner(host.run_sync_soon_threadsafe, host.run_sync_soon_not_threadsafe)
+
+    def submit():
+        runner.run(_job, time.perf_counter(), first_steps, done_callback=done)
+
+    def done(outcome):
+        nonlocal remaining
+        remaining -= 1
+        if isinstance(outcome, BaseException) or not remaining:
+            runner.close()
+            host.done_callback(outcome)
+        else:
+            submit()
+
+    host.post_message(submit)
+    host.mainloop()
+    return host.outcome, first_steps
+
+
+MODES = {
+    'fresh': run_fresh,
+    'runner': run_runner,
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--jobs', type=int, default=500, help='依次提交的任务数')
+    parser.add_argument('--modes', nargs='+', choices=list(MODES), default=list(MODES))
+    args = parser.parse_args(argv)
+
+    print(f'{"mode":<7} {"jobs":>5} {"first p50":>9} {"first p99":>9} {"per job":>8} '
+          f'{"threads":>7}  (ms)')
+    for name in args.modes:
+        threads_before = threading.active_count()
+        started = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            outcome, first_steps = MODES[name](args.jobs)
+        elapsed = time.perf_counter() - started
+        if isinstance(outcome, BaseException):
+            raise outcome
+        s = summarize(first_steps)
+        print(f'{name:<7} {s["n"]:>5} {_fmt(s["p50"]):>9} {_fmt(s["p99"]):>9} '
+              f'{_fmt(elapsed / args.jobs)} {threading.active_count() - threads_before:>7}',
+              flush=True)
+
+
+if __name__ == '__main__':
+    main()
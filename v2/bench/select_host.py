@@ -0,0 +1,106 @@
+"""自带 poller 的宿主：只用 backend_fd() + backend_timeout() 集成 guest loop
+
+宿主是一个普通的 select 循环，除了 guest loop 的 fd 还监听自己的一个 socketpair
+（另一个线程按固定间隔写入，模拟宿主自己的事件源），没有额外线程，也不轮询。
+对比 asyncio_guest_run + 后端线程 + HeadlessHost。
+
+    python -m bench.select_host --duration 2 --idle 2
+"""
+import argparse
+import contextlib
+import io
+import select
+import socket
+import threading
+
+from bench.guest_latency import _fmt, _measure_cpu, summarize
+from bench.host import HeadlessHost
+
+from asyncio_guest_run import GuestLoop, asyncio_guest_run
+
+
+def _host_events(rate, stop):
+    """另一个线程按 rate 每秒往宿主自己的 socket 写一个字节"""
+    rsock, wsock = socket.socketpair()
+    rsock.setblocking(False)
+
+    def send_loop():
+        while not stop.wait(1 / rate):
+            wsock.send(b'\0')
+        wsock.close()
+
+    threading.Thread(target=send_loop, daemon=True).start()
+    return rsock
+
+
+def run_select(period, duration, traffic_rate, idle, host_rate):
+    samples, cpu = [], {}
+    stop = threading.Event()
+    host_sock = _host_events(host_rate, stop)
+    with contextlib.redirect_stdout(io.StringIO()):
+        guest = GuestLoop(_measure_cpu, period, duration, traffic_rate, idle, samples, cpu)
+        guest_fd = guest.fileno()
+        try:
+            while not guest.done():
+                readable, _, _ = select.select([guest_fd, host_sock], [], [], guest.timeout())
+                if host_sock in readable:
+                    host_sock.recv(4096)
+                # fd 可读或超时都说明 guest 有事可做；只有宿主事件时 tick 也很便宜
+                guest.tick()
+        finally:
+            stop.set()
+            host_sock.close()
+    exc = guest.task.exception()
+    guest.close()
+    if exc is not None:
+        raise exc
+    return samples, cpu
+
+
+def run_thread(period, duration, traffic_rate, idle, host_rate):
+    samples, cpu = [], {}
+    host = HeadlessHost()
+    with contextlib.redirect_stdout(io.StringIO()):
+        task = asyncio_guest_run(
+            _measure_cpu, period, duration, traffic_rate, idle, samples, cpu,
+            run_sync_soon_threadsafe=host.run_sync_soon_threadsafe,
+            run_sync_soon_not_threadsafe=host.run_sync_soon_not_threadsafe,
+            done_callback=host.done_callback,
+        )
+        host.mainloop()
+    if isinstance(host.outcome, BaseException):
+        raise host.outcome
+    return samples, cpu
+
+
+MODES = {
+    'select': run_select,
+    'thread': run_thread,
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--duration', type=float, default=2.0, help='探针运行时间（秒）')
+    parser.add_argument('--idle', type=float, default=2.0, help='空闲阶段时间（秒）')
+    parser.add_argument('--period', type=float, default=0.01, help='探针定时器周期（秒）')
+    parser.add_argument('--traffic', type=int, nargs='+', default=[0, 2000],
+                        help='socket 流量（每秒消息数，0 表示关闭）')
+    parser.add_argument('--host-rate', type=float, default=50.0,
+                        help='select 宿主自己的事件源每秒事件数')
+    parser.add_argument('--modes', nargs='+', choices=list(MODES), default=list(MODES))
+    args = parser.parse_args(argv)
+
+    print(f'{"mode":<8} {"traffic":>7} {"n":>6} {"late p50":>8} {"late p99":>8} '
+          f'{"late p999":>9} {"busy cpu":>8} {"idle cpu":>8}  (ms)')
+    for traffic_rate in args.traffic:
+        for name in args.modes:
+            samples, cpu = MODES[name](args.period, args.duration, traffic_rate, args.idle,
+                                       args.host_rate)
+            s = summarize(samples)
+            print(f'{name:<8} {traffic_rate:>7} {s["n"]:>6} {_fmt(s["p50"])} {_fmt(s["p99"])} '
+                  f'{_fmt(s["p999"]):>9} {cpu["busy"]:>8.1%} {cpu["idle"]:>8.1%}', flush=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,139 @@
+"""定时器存储基准：每连接超时场景
+
+N 个连接各有一个超时定时器，截止时间均匀分布在 [now, now + timeout) 内。
+虚拟时钟每步前进 step 秒：取出到期定时器并重新挂上；另有 activity 比例的连接
+在这一步有数据到达，取消旧超时、挂上新的（asyncio.timeout/wait_for 的典型模式）；
+每步查询一次下一个截止时间并执行一次 process_ready（含已取消定时器的压缩）。
+对比默认的 TimerHandle 堆、HeapTimerStore 和 TimingWheel。
+timeout 决定每步到期的定时器数：30 秒时每步只有一两个到期，开销主要是加入、取消和压缩；
+1 秒、0.1 秒时每步有几十到几百个到期，取出的开销占主要部分。
+
+    python -m bench.timer_store --timers 50000 --timeout 30
+    python -m bench.timer_store --timers 50000 --timeout 0.1 --steps 1000
+"""
+import argparse
+import gc
+import heapq
+import random
+import time
+from asyncio import events
+
+from guest_events import new_guest_event_loop
+from timer_store import HeapTimerStore, TimingWheel
+
+
+STORES = {
+    # None: BaseEventLoop 默认的 _scheduled 堆，比较走 TimerHandle.__lt__
+    'heapq[TimerHandle]': lambda: None,
+    'HeapTimerStore': HeapTimerStore,
+    'TimingWheel': TimingWheel,
+}
+
+
+def _noop():
+    pass
+
+
+_PUSH, _CANCEL, _TICK = range(3)
+
+
+def generate(timers, timeout, step, steps, activity, seed):
+    """先生成操作序列，再对每种存储重放，保证各存储看到完全相同的工作负载"""
+    rng = random.Random(seed)
+    whens = []
+    ops = []
+    pending = []          # (when, id)，用来算出每步到期的定时器
+    cancelled = set()
+
+    def arm(when):
+        whens.append(when)
+        handle_id = len(whens) - 1
+        heapq.heappush(pending, (when, handle_id))
+        ops.append((_PUSH, handle_id))
+        return handle_id
+
+    conns = [arm(rng.uniform(0, timeout)) for _ in range(timers)]
+    warmup = len(ops)
+    active = max(1, int(timers * activity))
+    now = 0.0
+    for _ in range(steps):
+        now += step
+        ops.append((_TICK, now))
+        while pending and pending[0][0] < now:
+            handle_id = heapq.heappop(pending)[1]
+            if handle_id in cancelled:
+                cancelled.discard(handle_id)
+                continue
+            # 超时的连接重新挂一个超时
+            conns[rng.randrange(timers)] = arm(now + timeout)
+        for _ in range(active):
+            i = rng.randrange(timers)
+            cancelled.add(conns[i])
+            ops.append((_CANCEL, conns[i]))
+            conns[i] = arm(now + rng.uniform(0, timeout))
+    return whens, ops, warmup
+
+
+def replay(store, whens, ops, warmup):
+    """通过 guest loop 自己的路径重放：call_at 的入队、poll_events 查截止时间、
+    process_ready 取出到期定时器（含已取消定时器的压缩）"""
+    loop = new_guest_event_loop()
+    now = 0.0
+    # 换成虚拟时钟，process_ready 按它判断到期
+    loop.time = lambda: now
+    loop.set_timer_store(store)
+    if store is None:
+        def push(handle):
+            heapq.heappush(loop._scheduled, handle)
+    else:
+        push = store.push
+    handles = [events.TimerHandle(when, _noop, (), loop) for when in whens]
+    for handle in handles:
+        handle._scheduled = True
+    for _, handle_id in ops[:warmup]:
+        push(handles[handle_id])
+    next_deadline, process_ready = loop._next_timer_deadline, loop._process_ready
+    # 与 timeit 一样关掉 gc，否则几十万个 handle 的遍历会淹没存储本身的开销
+    gc.collect()
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        for kind, arg in ops[warmup:]:
+            if kind == _PUSH:
+                push(handles[arg])
+            elif kind == _CANCEL:
+                handles[arg].cancel()
+            else:
+                now = arg
+                next_deadline()
+                process_ready(None)
+        elapsed = time.perf_counter() - start
+    finally:
+        gc.enable()
+        stats = loop.timer_stats()
+        loop.close()
+    return elapsed, stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--timers', type=int, default=50000)
+    parser.add_argument('--timeout', type=float, default=30.0, help='每连接超时（秒）')
+    parser.add_argument('--step', type=float, default=0.001, help='每步虚拟时间（秒）')
+    parser.add_argument('--steps', type=int, default=2000)
+    parser.add_argument('--activity', type=float, default=0.002,
+                        help='每步重置超时的连接比例')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    whens, ops, warmup = generate(args.timers, args.timeout, args.step, args.steps,
+                                  args.activity, args.seed)
+    print(f'{"store":<20} {"us/step":>10} {"stored":>10} {"cancelled":>10} {"compactions":>12}')
+    for name, factory in STORES.items():
+        elapsed, stats = replay(factory(), whens, ops, warmup)
+        print(f'{name:<20} {elapsed / args.steps * 1e6:>10.2f} {stats["scheduled"]:>10} '
+              f'{stats["cancelled_fraction"]:>10.1%} {stats["compactions"]:>12}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+"""Tk 宿主基准：定时器延迟和 CPU 占用
+
+对比两种把 guest tick 投递到 Tk 线程的方式：
+- after: 后端线程直接调用 root.after(0, ...)（v1 的做法，Tcl 不保证跨线程安全）
+- filehandler: tk_host.TkHost，self-pipe + createfilehandler，一批回调只唤醒一次
+
+先用 check_latency 探针跑 duration 秒（可叠加 socket 流量），再让 loop 空闲 idle 秒，
+分别统计进程 CPU 时间占墙钟时间的比例。无显示环境可以用 Xvfb：
+
+    xvfb-run python -m bench.tk_host --duration 2 --idle 2
+
+没有 DISPLAY 时 filehandler 退回 tkinter.Tcl()（同样的 Tcl notifier，只是不加载 Tk）；
+after 依赖 Tk 主循环做跨线程调用，会被跳过。
+"""
+import argparse
+import contextlib
+import io
+import tkinter
+
+from bench.guest_latency import _fmt, _measure_cpu, summarize
+
+from asyncio_guest_run import asyncio_guest_run
+from tk_host import TkHost
+
+
+class AfterHost:
+    """基线：跨线程直接调用 root.after(0, func)，需要真正的 Tk 主窗口"""
+
+    needs_display = True
+
+    def __init__(self, root):
+        self.root = root
+        self.outcome = None
+
+    def run_sync_soon_threadsafe(self, func):
+        self.root.after(0, func)
+
+    def run_sync_soon_not_threadsafe(self, func):
+        self.root.after(0, func)
+
+    def done_callback(self, outcome):
+        self.outcome = outcome
+        self.root.quit()
+
+    def mainloop(self):
+        self.root.mainloop()
+
+    def close(self):
+        pass
+
+
+HOSTS = {
+    'after': AfterHost,
+    'filehandler': TkHost,
+}
+
+
+def _make_root():
+    """返回 (root, 是否加载了 Tk)"""
+    try:
+        root = tkinter.Tk()
+    except tkinter.TclError:
+        return tkinter.Tcl(), False
+    root.withdraw()
+    return root, True
+
+
+def run(host_factory, period, duration, traffic_rate, idle):
+    samples, cpu = [], {}
+    root, has_tk = _make_root()
+    if getattr(host_factory, 'needs_display', False) and not has_tk:
+        return None, None
+    host = host_factory(root)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            task = asyncio_guest_run(
+                _measure_cpu, period, duration, traffic_rate, idle, samples, cpu,
+                run_sync_soon_threadsafe=host.run_sync_soon_threadsafe,
+                run_sync_soon_not_threadsafe=host.run_sync_soon_not_threadsafe,
+                done_callback=host.done_callback,
+            )
+            host.mainloop()
+    finally:
+        host.close()
+        # tkinter.Tcl() 没有 destroy 命令
+        with contextlib.suppress(tkinter.TclError):
+            root.destroy()
+    if isinstance(host.outcome, BaseException):
+        raise host.outcome
+    return samples, cpu
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--duration', type=float, default=2.0, help='探针运行时间（秒）')
+    parser.add_argument('--idle', type=float, default=2.0, help='空闲阶段时间（秒）')
+    parser.add_argument('--period', type=float, default=0.01, help='探针定时器周期（秒）')
+    parser.add_argument('--traffic', type=int, nargs='+', default=[0, 2000],
+                        help='socket 流量（每秒消息数，0 表示关闭）')
+    parser.add_argument('--hosts', nargs='+', choices=list(HOSTS), default=list(HOSTS))
+    args = parser.parse_args(argv)
+
+    print(f'{"host":<12} {"traffic":>7} {"n":>6} {"late p50":>8} {"late p99":>8} '
+          f'{"late p999":>9} {"busy cpu":>8} {"idle cpu":>8}  (ms)')
+    for traffic_rate in args.traffic:
+        for name in args.hosts:
+            samples, cpu = run(HOSTS[name], args.period, args.duration, traffic_rate, args.idle)
+            if samples is None:
+                print(f'{name:<12} {traffic_rate:>7}  skipped: no display')
+                continue
+            s = summarize(samples)
+            print(f'{name:<12} {traffic_rate:>7} {s["n"]:>6} {_fmt(s["p50"])} {_fmt(s["p99"])} '
+                  f'{_fmt(s["p999"]):>9} {cpu["busy"]:>8.1%} {cpu["idle"]:>8.1%}', flush=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""宿主线程发起的异步工作的启动延迟
+
+模拟按钮回调：另一个线程定时往无窗口宿主投递“点击”，点击回调在宿主线程上
+（tick 之外）调用 loop.create_task / loop.call_later，测量到协程或定时器真正执行的时间。
+guest loop 本身处于空闲状态，后端线程阻塞在一个很长的轮询超时上。
+
+    python -m bench.ui_wakeup --clicks 200
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import threading
+import time
+
+from bench.host import HeadlessHost
+from bench.guest_latency import summarize, _fmt
+
+from asyncio_guest_run import asyncio_guest_run
+
+
+def run(clicks, interval, timer_delay):
+    task_lags, timer_lags = [], []
+    host = HeadlessHost()
+
+    async def job(clicked):
+        task_lags.append(time.perf_counter() - clicked)
+
+    def fire(clicked):
+        timer_lags.append(time.perf_counter() - clicked - timer_delay)
+
+    def click():
+        loop = asyncio.get_event_loop()
+        clicked = time.perf_counter()
+        loop.create_task(job(clicked))
+        loop.call_later(timer_delay, fire, clicked)
+
+    def clicker():
+        for _ in range(clicks):
+            time.sleep(interval)
+            host.post_message(click)
+        time.sleep(interval + timer_delay)
+
+    async def main():
+        loop = asyncio.get_running_loop()
+        waiter = loop.create_future()
+        threading.Thread(target=lambda: (clicker(), loop.call_soon_threadsafe(waiter.set_result, None)),
+                         daemon=True).start()
+        # 只留一个很远的定时器，后端轮询超时就以它为准
+        idle_task = loop.create_task(asyncio.sleep(3600))
+        await waiter
+        idle_task.cancel()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        task = asyncio_guest_run(
+            main,
+            run_sync_soon_threadsafe=host.run_sync_soon_threadsafe,
+            run_sync_soon_not_threadsafe=host.run_sync_soon_not_threadsafe,
+            done_callback=host.done_callback,
+        )
+        host.mainloop()
+    if isinstance(host.outcome, BaseException):
+        raise host.outcome
+    return task_lags, timer_lags
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--clicks', type=int, default=200)
+    parser.add_argument('--interval', type=float, default=0.01, help='点击间隔（秒）')
+    parser.add_argument('--timer-delay', type=float, default=0.005,
+                        help='点击回调里 call_later 的延迟（秒）')
+    args = parser.parse_args(argv)
+
+    task_lags, timer_lags = run(args.clicks, args.interval, args.timer_delay)
+    print(f'{"work":<12} {"n":>6} {"p50":>8} {"p99":>8} {"p999":>8}  (ms)')
+    for name, lags in (('create_task', task_lags), ('call_later', timer_lags)):
+        s = summarize(lags)
+        print(f'{name:<12} {s["n"]:>6} {_fmt(s["p50"])} {_fmt(s["p99"])} {_fmt(s["p999"])}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+"""其他线程 call_soon_threadsafe 的吞吐量：self-pipe 与合并的 eventfd 唤醒
+
+threads 个线程各自尽快提交 n 个 call_soon_threadsafe 回调（模拟工作线程、executor 完成
+和 run_coroutine_threadsafe），guest 任务等到全部回调执行完。统计每秒提交数、
+唤醒写入的系统调用次数和 tick 数。socketpair 是标准 loop 的 self-pipe，每次提交写一个字节。
+
+    python -m bench.wakeup --threads 4 --n 20000
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import threading
+import time
+
+from bench.host import HeadlessHost
+
+from asyncio_guest_run import GuestRunner
+from guest_events import GuestSelectorEventLoop
+
+
+class SocketpairLoop(GuestSelectorEventLoop):
+    _coalesce_wakeups = False
+
+    def _write_to_self(self):
+        self._wakeup_writes += 1
+        super()._write_to_self()
+
+
+async def _flood(threads, n):
+    loop = asyncio.get_running_loop()
+    total = threads * n
+    done = loop.create_future()
+    count = 0
+
+    def callback():
+        nonlocal count
+        count += 1
+        if count == total:
+            done.set_result(None)
+
+    def producer():
+        for _ in range(n):
+            loop.call_soon_threadsafe(callback)
+
+    started = time.perf_counter()
+    workers = [threading.Thread(target=producer, daemon=True) for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+    await done
+    elapsed = time.perf_counter() - started
+    for worker in workers:
+        worker.join()
+    return elapsed
+
+
+def run(loop_factory, threads, n):
+    host = HeadlessHost()
+    with contextlib.redirect_stdout(io.StringIO()):
+        runner = GuestRunner(host.run_sync_soon_threadsafe, host.run_sync_soon_not_threadsafe,
+                             loop_factory=loop_factory)
+        task = runner.run(_flood, threads, n, done_callback=host.done_callback)
+        host.mainloop()
+        writes = runner.loop._wakeup_writes
+        ticks = task.stats()['ticks']
+        runner.close()
+    if isinstance(host.outcome, BaseException):
+        raise host.outcome
+    return host.outcome, writes, ticks
+
+
+MODES = {
+    'socketpair': SocketpairLoop,
+    'eventfd': GuestSelectorEventLoop,
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--threads', type=int, nargs='+', default=[1, 4], help='提交线程数')
+    parser.add_argument('--n', type=int, default=20000, help='每个线程的提交数')
+    parser.add_argument('--modes', nargs='+', choices=list(MODES), default=list(MODES))
+    args = parser.parse_args(argv)
+    if not GuestSelectorEventLoop._coalesce_wakeups:
+        parser.error('os.eventfd is not available')
+
+    print(f'{"mode":<11} {"threads":>7} {"submits/s":>10} {"writes":>8} {"writes/submit":>13} '
+          f'{"ticks":>7}')
+    for threads in args.threads:
+        for name in args.modes:
+            elapsed, writes, ticks = run(MODES[name], threads, args.n)
+            total = threads * args.n
+            print(f'{name:<11} {threads:>7} {total / elapsed:>10.0f} {writes:>8} '
+                  f'{writes / total:>13.3f} {ticks:>7}', flush=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+import collections
+import threading
+
+
+class CoalescingDispatcher:
+    """合并跨线程回调的派发器，与具体宿主无关
+
+    run_sync_soon_threadsafe 只把函数放进 deque（append 在 GIL 下是原子的），
+    在这一批回调被宿主取走之前，最多只向宿主发送一次唤醒；宿主收到唤醒后
+    调用 drain() 一次执行整批回调。
+
+    post_wakeup(drain): 宿主原生的唤醒方式，必须保证之后在宿主线程上调用 drain，
+        例如 Win32 下的 PostMessage，或者直接传入宿主的 run_sync_soon_threadsafe。
+    """
+
+    def __init__(self, post_wakeup):
+        self._post_wakeup = post_wakeup
+        self._pending = collections.deque()
+        # 只保护“未唤醒 -> 已唤醒”这一次状态切换，快路径不加锁
+        self._lock = threading.Lock()
+        self._wakeup_pending = False
+
+    def run_sync_soon_threadsafe(self, func):
+        self._pending.append(func)
+        # 先入队再检查标志；drain 先清标志再取队列，所以看到 True 时
+        # 这个函数一定会被本批或下一批取走
+        if self._wakeup_pending:
+            return
+        self._wakeup()
+
+    def _wakeup(self):
+        with self._lock:
+            if self._wakeup_pending:
+                return
+            self._wakeup_pending = True
+        self._post_wakeup(self.drain)
+
+    def drain(self):
+        """在宿主线程上执行当前所有待处理回调"""
+        self._wakeup_pending = False
+        pending = self._pending
+        # 只执行本批的数量，回调里再提交的函数已经触发了新的唤醒
+        try:
+            for _ in range(len(pending)):
+                pending.popleft()()
+        finally:
+            if pending and not self._wakeup_pending:
+                self._wakeup()
+
+    def __len__(self):
+        return len(self._pending)
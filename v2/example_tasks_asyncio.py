@@ -105,7 +105,7 @@ async def count(display, period=0.5, max=20):
         print(traceback.format_exc())
         raise
 
-async def check_latency(display=None, period=0.1, duration=math.inf):
+async def check_latency(display=None, period=0.1, duration=math.inf, report=None):
     task = None
     if display is not None:
         task = asyncio.current_task()
@@ -121,7 +121,11 @@ async def check_latency(display=None, period=0.1, duration=math.inf):
                 
             target = asyncio.get_event_loop().time() + period
             await asyncio.sleep(period)
-            print(asyncio.get_event_loop().time() - target, flush=True)
+            lateness = asyncio.get_event_loop().time() - target
+            if report is None:
+                print(lateness, flush=True)
+            else:
+                report(lateness)
     except asyncio.CancelledError:
         print("Latency check was cancelled")
         raise
@@ -0,0 +1,75 @@
+"""GLib/GTK 宿主：把 guest loop 包装成一个 GSource
+
+不需要后端线程，也不忙等：
+- prepare: 有就绪回调时立即分发，否则把到下一个 asyncio 定时器的时间作为超时交给 GLib
+- selector 的 fd（Linux 上是 epoll fd）由 GLib 自己 poll，socket 可读、
+  call_soon_threadsafe 写 self-pipe 都会让它可读
+- dispatch: 非阻塞地取出 I/O 事件，执行一次 guest tick
+
+GTK 信号处理函数里调用 create_task/call_soon 不需要额外唤醒，它返回后 GLib 会
+重新 prepare，看到 _ready 非空就会立即分发。
+
+    task = glib_guest_run(main, done_callback=lambda outcome: Gtk.main_quit())
+    Gtk.main()
+
+要求 selector 有 fileno()（epoll/kqueue/devpoll），SelectSelector 不行。
+"""
+import math
+
+from gi.repository import GLib
+
+from asyncio_guest_run import GuestLoop
+
+
+class AsyncioSource(GLib.Source):
+    def __init__(self, guest, ready_budget=None):
+        super().__init__()
+        self.guest = guest
+        self.ready_budget = ready_budget
+        self.set_name('asyncio guest loop')
+        self._tag = self.add_unix_fd(guest.fileno(), GLib.IOCondition.IN)
+
+    def _timeout(self):
+        """到下一次需要 tick 的毫秒数，-1 表示只等 fd"""
+        timeout = self.guest.timeout()
+        if timeout is None:
+            return -1
+        # 向上取整，避免在定时器到期前一点点醒来又空转一轮
+        return math.ceil(timeout * 1e3)
+
+    def prepare(self):
+        timeout = self._timeout()
+        return timeout == 0, timeout
+
+    def check(self):
+        return bool(self.query_unix_fd(self._tag)) or self._timeout() == 0
+
+    def dispatch(self, callback, args):
+        # GLib 已经替我们等过了，tick 里只做非阻塞轮询
+        self.guest.tick(self.ready_budget)
+        return GLib.SOURCE_CONTINUE
+
+
+def glib_guest_run(async_func, *async_func_args, done_callback, context=None, ready_budget=None):
+    """在 GLib 主循环里运行 async_func，与 asyncio_guest_run 相同的 done_callback 约定
+
+    context: 挂载 GSource 的 GLib.MainContext，None 表示默认 context。
+    ready_budget: 每次 dispatch 执行就绪回调的时间预算（秒），None 表示不限。
+    """
+    def on_done(outcome):
+        source.destroy()
+        # on_done 在 dispatch 的 tick 里调用，这时关闭 loop 会打断 _process_ready，
+        # 等回到主循环再关
+        idle = GLib.idle_source_new()
+        idle.set_callback(close_guest)
+        idle.attach(context)
+        done_callback(outcome)
+
+    def close_guest(*args):
+        guest.close()
+        return GLib.SOURCE_REMOVE
+
+    guest = GuestLoop(async_func, *async_func_args, done_callback=on_done)
+    source = AsyncioSource(guest, ready_budget)
+    source.attach(context)
+    return guest.task
@@ -0,0 +1,619 @@
+"""guest mode 事件循环：标准 selector/proactor loop 的子类，不需要替换 asyncio.base_events
+
+GuestEventLoopMixin 在标准 loop 之上加 poll_events/process_events/process_ready 以及
+定时器存储、timerfd、时间预算、慢回调记录等 guest mode 功能；对标准实现只覆盖
+close/call_at/call_soon/_timer_handle_cancelled/_write_to_self/run_in_executor，
+其余行为与 asyncio 自带的 loop 相同。
+原来的做法（patches/base_events_patched.py + import hook）必须在任何 asyncio 导入之前
+安装，而且只对应一个 CPython 版本的 base_events.py；这里直接导入即可::
+
+    from guest_events import new_guest_event_loop
+    loop = new_guest_event_loop()
+
+依赖的 BaseEventLoop 私有属性见 _REQUIRED_INTERNALS，在 3.10–3.14 中都存在；
+缺少时在创建 loop 时报错，而不是在第一次 tick 时。
+"""
+import asyncio
+import collections
+import heapq
+import os
+import sys
+import threading
+import time
+import traceback
+from asyncio import base_events, events, tasks
+
+# 与 asyncio.base_events 中的同名常量一致，新版本改名或删除时退回这些默认值
+_MIN_SCHEDULED_TIMER_HANDLES = getattr(base_events, '_MIN_SCHEDULED_TIMER_HANDLES', 100)
+_MIN_CANCELLED_TIMER_HANDLES_FRACTION = getattr(
+    base_events, '_MIN_CANCELLED_TIMER_HANDLES_FRACTION', 0.5)
+MAXIMUM_SELECT_TIMEOUT = getattr(base_events, 'MAXIMUM_SELECT_TIMEOUT', 24 * 3600)
+
+# guest mode 直接读写的标准 loop 私有属性和方法
+_REQUIRED_INTERNALS = (
+    '_ready', '_scheduled', '_timer_cancelled_count', '_clock_resolution', '_stopping',
+    '_selector', '_process_events', '_write_to_self', '_check_closed', '_check_thread',
+    '_check_callback', '_default_executor', '_check_default_executor',
+)
+
+
+class GuestEventLoopMixin:
+    """给标准事件循环加上 guest mode 接口，放在 MRO 中标准 loop 类的前面"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        missing = [name for name in _REQUIRED_INTERNALS if not hasattr(self, name)]
+        if missing:
+            self.close()
+            raise RuntimeError(
+                f'{type(self).__name__} does not support Python {sys.version.split()[0]}: '
+                f'event loop has no {", ".join(missing)}')
+        if self._coalesce_wakeups and hasattr(self, '_add_reader'):
+            self._wakeup_fd = os.eventfd(0, os.EFD_NONBLOCK | os.EFD_CLOEXEC)
+            self._wakeup_lock = threading.Lock()
+            self._add_reader(self._wakeup_fd, self._read_wakeup_fd)
+        if isinstance(self, asyncio.SelectorEventLoop):
+            self._guest_selector_map = self._selector.get_map()
+
+    def close(self):
+        super().close()
+        if self._timer_store is not None:
+            self._timer_store.clear()
+        if self._timerfd is not None:
+            self._timerfd.close()
+            self._timerfd = None
+        lock = self._wakeup_lock
+        if lock is not None:
+            # 与 _write_to_self 的写入互斥：fd 号关闭后可能被复用，不能让其他线程
+            # 拿着旧的 fd 号把 8 个字节写进无关的描述符
+            with lock:
+                wakeup_fd, self._wakeup_fd = self._wakeup_fd, None
+                if wakeup_fd is not None:
+                    os.close(wakeup_fd)
+
+    # guest mode: 合并的跨线程唤醒（Linux）。self-pipe 每次 _write_to_self 都写一个字节，
+    # 即使上一次写入还没被读走；这里只在没有待处理的唤醒时写一次 eventfd，
+    # 读端回调读走计数后再清掉标记。信号的 wakeup fd 仍然是原来的 self-pipe
+    _coalesce_wakeups = hasattr(os, 'eventfd')
+    _wakeup_fd = None
+    _wakeup_lock = None            # 保护 _wakeup_fd 的写入和关闭，只在慢路径上获取
+    _wakeup_pending = False
+    _wakeup_writes = 0             # 实际写 eventfd 的次数
+
+    def _write_to_self(self):
+        lock = self._wakeup_lock
+        if lock is None:
+            super()._write_to_self()
+            return
+        # 调用方已经把回调放进 _ready；还有一次唤醒没被读走时 loop 反正会醒来
+        if self._wakeup_pending:
+            return
+        with lock:
+            wakeup_fd = self._wakeup_fd
+            # loop 已经关闭，或者等锁期间别的线程已经写过了
+            if wakeup_fd is None or self._wakeup_pending:
+                return
+            self._wakeup_pending = True
+            self._wakeup_writes += 1
+            try:
+                os.eventfd_write(wakeup_fd, 1)
+            except OSError:
+                pass
+
+    def _read_wakeup_fd(self):
+        # 先读走计数再清标记：清标记之前跳过写入的线程，回调已经在 _ready 里，
+        # _ready 非空时轮询不会阻塞；清标记之后的线程会重新写一次
+        try:
+            os.eventfd_read(self._wakeup_fd)
+        except BlockingIOError:
+            pass
+        self._wakeup_pending = False
+
+    def call_at(self, when, callback, *args, context=None):
+        if self._timer_store is None:
+            timer = super().call_at(when, callback, *args, context=context)
+        else:
+            # 与 BaseEventLoop.call_at 相同，只是入队到定时器存储而不是 _scheduled 堆
+            if when is None:
+                raise TypeError("when cannot be None")
+            self._check_closed()
+            if self._debug:
+                self._check_thread()
+                self._check_callback(callback, 'call_at')
+            timer = events.TimerHandle(when, callback, args, self, context)
+            self._timer_store.push(timer)
+            timer._scheduled = True
+        if timer._source_traceback:
+            del timer._source_traceback[-1]
+        timerfd = self._timerfd
+        if timerfd is not None:
+            # timerfd_settime 是线程安全的，正在阻塞的 select 会直接按新的截止时间醒来
+            if timerfd.deadline is None or when < timerfd.deadline:
+                timerfd.arm(when)
+        elif self._guest_polling and not self._guest_defer_wake and (
+                self._guest_poll_deadline is None or when < self._guest_poll_deadline):
+            self._wake_guest_poller()
+        return timer
+
+    def call_soon(self, callback, *args, context=None):
+        handle = super().call_soon(callback, *args, context=context)
+        if handle._source_traceback:
+            del handle._source_traceback[-1]
+        if self._guest_polling and not self._guest_defer_wake:
+            self._wake_guest_poller()
+        return handle
+
+    def run_in_executor(self, executor, func, *args):
+        # guest_executor.GuestExecutor 自己把结果交回宿主线程，不经过 call_soon_threadsafe
+        run_in_guest = getattr(executor or self._default_executor, 'run_in_guest', None)
+        if run_in_guest is None:
+            return super().run_in_executor(executor, func, *args)
+        self._check_closed()
+        if self._debug:
+            self._check_callback(func, 'run_in_executor')
+        if executor is None:
+            self._check_default_executor()
+        return run_in_guest(self, func, *args)
+
+    def _timer_handle_cancelled(self, handle):
+        if handle._scheduled:
+            if self._timer_store is not None:
+                self._timer_store.cancelled += 1
+            else:
+                self._timer_cancelled_count += 1
+
+    # guest mode: process_ready 时间预算的统计，首次更新时变成实例属性
+    _ready_budget_ticks = 0        # 带预算执行的 tick 数
+    _ready_overrun_ticks = 0       # 超出预算的 tick 数
+    _ready_carried_total = 0       # 累计留到下一 tick 的 handle 数
+    _ready_last_carried = 0        # 最近一次 tick 留下的 handle 数
+    _ready_last_overrun = 0.0      # 最近一次 tick 超出预算的时间（秒）
+    _ready_max_overrun = 0.0
+    # guest mode: process_ready 累计执行（含已取消而跳过）的 handle 数
+    _ready_processed = 0
+    # guest mode: 慢回调记录，None 表示关闭检测
+    _slow_callbacks = None
+    _slow_callback_threshold_ns = 0
+
+    def set_slow_callback_log(self, maxlen=128, threshold=None):
+        """guest mode: 在 process_ready 中给每个 handle 计时，不需要开 debug 模式
+
+        超过 threshold 秒（默认 self.slow_callback_duration）的回调连同其 task 名和
+        协程栈记入最多 maxlen 条的日志，见 slow_callbacks()。maxlen 为 0/None 时关闭。
+        """
+        if not maxlen:
+            self._slow_callbacks = None
+            return
+        if threshold is None:
+            threshold = self.slow_callback_duration
+        self._slow_callback_threshold_ns = int(threshold * 1e9)
+        old = self._slow_callbacks or ()
+        self._slow_callbacks = collections.deque(old, maxlen=maxlen)
+
+    def slow_callbacks(self):
+        """guest mode: 最近记录的慢回调，SlowCallback 列表，按时间顺序"""
+        return list(self._slow_callbacks or ())
+
+    def _run_timed(self, handle):
+        start = time.perf_counter_ns()
+        handle._run()
+        elapsed = time.perf_counter_ns() - start
+        if elapsed >= self._slow_callback_threshold_ns:
+            self._record_slow_callback(handle, elapsed)
+
+    def _record_slow_callback(self, handle, elapsed_ns):
+        cb = handle._callback
+        task = getattr(cb, '__self__', None)
+        if isinstance(task, tasks.Task):
+            task_name = task.get_name()
+            coro = task.get_coro()
+            callback = getattr(coro, '__qualname__', None) or repr(coro)
+            # 回调返回后协程停在下一个 await 处，栈指向刚刚执行完的那一段
+            stack = None if task.done() else _coro_stack(coro)
+        else:
+            task_name = None
+            callback = getattr(cb, '__qualname__', None) or repr(cb)
+            stack = None
+        self._slow_callbacks.append(
+            SlowCallback(elapsed_ns / 1e9, callback, task_name, stack, self.time()))
+
+    # guest mode: 后端线程阻塞在 poll_events 里时为 True。这时宿主线程在 tick 之外
+    # 调度的工作（call_soon/create_task，或比轮询截止时间更早的定时器）需要打断轮询
+    _guest_polling = False
+    _guest_poll_deadline = None    # 轮询醒来的 loop.time()，None 表示无限等待
+    # guest mode: 为 True 时 call_soon/call_at 不叫醒轮询，由调用方之后用
+    # _recheck_guest_poll() 统一检查（流水线模式的 tick 期间）
+    _guest_defer_wake = False
+
+    # guest mode: 可插拔的定时器存储，None 表示使用默认的 _scheduled 堆
+    _timer_store = None
+
+    def set_timer_store(self, store):
+        """guest mode: 用 store 管理定时器（接口见 v2/timer_store.py），None 恢复 _scheduled 堆
+
+        已有的定时器会迁移到新的存储里。store 只在 poll_events/process_ready 中使用，
+        设置之后不能再用 run_forever/run_until_complete 驱动这个 loop。
+        """
+        old = self._timer_store
+        handles = []
+        for handle in (old.handles() if old is not None else self._scheduled):
+            if handle._cancelled:
+                handle._scheduled = False
+            else:
+                handles.append(handle)
+        if old is not None:
+            old.clear()
+        else:
+            self._scheduled.clear()
+            self._timer_cancelled_count = 0
+        self._timer_store = store
+        for handle in handles:
+            if store is not None:
+                store.push(handle)
+            else:
+                self._scheduled.append(handle)
+        if store is None:
+            heapq.heapify(self._scheduled)
+        if self._timerfd is not None:
+            self._arm_timerfd()
+
+    # guest mode: 在最早的定时器截止时间唤醒 selector 的 timerfd（v2/timerfd.py）
+    _timerfd = None
+
+    def set_timerfd(self, timerfd):
+        """guest mode: 用 timerfd 在最早的定时器截止时间唤醒 selector，None 关闭
+
+        timerfd 注册在 selector 里，之后 backend_timeout() 不再因为定时器返回有限超时，
+        后端线程和等待 backend_fd() 的宿主都由它精确唤醒。loop 关闭时一起关闭。
+        """
+        old = self._timerfd
+        if old is not None:
+            self.remove_reader(old.fileno())
+            old.disarm()
+        self._timerfd = timerfd
+        if timerfd is not None:
+            self.add_reader(timerfd.fileno(), self._read_timerfd)
+            self._arm_timerfd()
+
+    def _read_timerfd(self):
+        # 读到到期计数说明这次设定已经用掉了，按当前最早的定时器重新设定
+        self._timerfd.read()
+        self._arm_timerfd()
+
+    def _arm_timerfd(self):
+        timerfd = self._timerfd
+        when = self._next_timer_deadline()
+        if when != timerfd.deadline:
+            if when is None:
+                timerfd.disarm()
+            else:
+                timerfd.arm(when)
+
+    def _spin_to_timer(self):
+        # timerfd 提前 spin 秒唤醒，剩下的时间忙等，只读定时器存储，后端线程上调用也安全
+        when = self._next_timer_deadline()
+        if when is not None and 0 < when - self.time() <= self._timerfd.spin:
+            while self.time() < when:
+                pass
+
+    # guest mode: 已取消定时器的压缩次数
+    _timer_compactions = 0
+
+    def _compact_timers(self):
+        """guest mode: 清理已取消的定时器，process_ready 每个 tick 调用一次
+
+        增量部分：每个 tick 弹出堆顶已取消的定时器（与 _run_once 相同）；
+        摊还部分：已取消的比例超过 _MIN_CANCELLED_TIMER_HANDLES_FRACTION 时整体重建，
+        每次重建至少对应同样数量的 cancel()，所以摊到每次 cancel 上是 O(1)。
+        """
+        store = self._timer_store
+        if store is not None:
+            size, cancelled = len(store), store.cancelled
+        else:
+            size, cancelled = len(self._scheduled), self._timer_cancelled_count
+        if (size > _MIN_SCHEDULED_TIMER_HANDLES and
+            cancelled / size > _MIN_CANCELLED_TIMER_HANDLES_FRACTION):
+            self._timer_compactions += 1
+            if store is not None:
+                store.compact()
+                return
+            new_scheduled = []
+            for handle in self._scheduled:
+                if handle._cancelled:
+                    handle._scheduled = False
+                else:
+                    new_scheduled.append(handle)
+
+            heapq.heapify(new_scheduled)
+            # 后端线程只读 _scheduled[0]，整体替换列表是安全的
+            self._scheduled = new_scheduled
+            self._timer_cancelled_count = 0
+        elif store is None:
+            while self._scheduled and self._scheduled[0]._cancelled:
+                self._timer_cancelled_count -= 1
+                handle = heapq.heappop(self._scheduled)
+                handle._scheduled = False
+
+    def timer_stats(self):
+        """guest mode: 定时器存储的大小和已取消的比例"""
+        store = self._timer_store
+        if store is not None:
+            size, cancelled = len(store), store.cancelled
+        else:
+            size, cancelled = len(self._scheduled), self._timer_cancelled_count
+        return {
+            'scheduled': size,
+            'cancelled': cancelled,
+            'cancelled_fraction': cancelled / size if size else 0.0,
+            'compactions': self._timer_compactions,
+        }
+
+    def _timer_count(self):
+        store = self._timer_store
+        return len(store) if store is not None else len(self._scheduled)
+
+    def _next_timer_deadline(self):
+        try:
+            if self._timer_store is not None:
+                return self._timer_store.next_deadline()
+            if self._scheduled:
+                return self._scheduled[0]._when
+        except IndexError:
+            # 后端线程读的时候 UI 线程正好取走了最后一个定时器
+            pass
+        return None
+
+    def _guest_timeout(self):
+        """到下一次需要 tick 的秒数，None 表示只等 I/O"""
+        if self._ready or self._stopping:
+            return 0
+        if self._timerfd is not None:
+            # 定时器到期时 timerfd 会让 selector 可读
+            return None
+        when = self._next_timer_deadline()
+        if when is None:
+            return None
+        # 计算所需的超时时间
+        timeout = when - self.time()
+        if timeout > MAXIMUM_SELECT_TIMEOUT:
+            return MAXIMUM_SELECT_TIMEOUT
+        if timeout < 0:
+            return 0
+        return timeout
+
+    def backend_fd(self):
+        """guest mode: 交给宿主 poller 的 fd（epoll/kqueue/devpoll 实例本身）
+
+        有 I/O 事件、其他线程 call_soon_threadsafe，或者 backend_timeout() 之后调度了
+        更早的工作时可读；可读后宿主做一次非阻塞的 tick 即可。
+        """
+        try:
+            return self._selector.fileno()
+        except AttributeError:
+            raise NotImplementedError(
+                f'{type(self._selector).__name__} has no pollable fd') from None
+
+    def backend_timeout(self, tick_pending=None):
+        """guest mode: 宿主等待 backend_fd() 的超时（秒），None 表示不用超时
+
+        先标记正在轮询再计算超时：标记之前调度的工作会让超时变成 0，之后调度的
+        工作（包括宿主线程上 tick 之外的 call_soon/更早的 call_at）会写 self-pipe
+        让 backend_fd() 可读，所以宿主可以放心阻塞这么久。
+
+        tick_pending: 可选的无参函数，标记之后调用；返回 True 表示 UI 线程上还有一个
+            tick 没结束，它结束时会调用 _recheck_guest_poll()。这时 _ready 和定时器正在
+            被那个 tick 修改，交给那次检查，这里只等 I/O。
+        """
+        self._guest_poll_deadline = None
+        self._guest_polling = True
+        if tick_pending is not None and tick_pending():
+            return None
+        timeout = self._guest_timeout()
+        if timeout is not None:
+            self._guest_poll_deadline = self.time() + timeout
+        return timeout
+
+    def cancel_backend_timeout(self):
+        """guest mode: 宿主不再等待 backend_fd() 时调用，之后调度的工作不再写 self-pipe"""
+        self._guest_polling = False
+
+    def _recheck_guest_poll(self):
+        """guest mode: tick 结束时在 UI 线程上调用，后端线程与 tick 并行轮询时使用
+
+        后端线程算超时的时候 tick 正在修改 _ready 和定时器，看到的可能是中间状态；
+        按 tick 结束后的状态应该更早醒来时叫醒它。
+        """
+        if not self._guest_polling:
+            return
+        timeout = self._guest_timeout()
+        if timeout is None:
+            return
+        deadline = self._guest_poll_deadline
+        if deadline is None or self.time() + timeout < deadline:
+            self._wake_guest_poller()
+
+    def _wake_guest_poller(self):
+        # 一次轮询只写一次 self-pipe
+        self._guest_polling = False
+        self._write_to_self()
+
+    def poll_events(self, timeout=None, tick_pending=None):
+        """轮询I/O事件但不处理它们
+
+        timeout: None 时按就绪回调和最早的定时器计算（后端线程的阻塞轮询）；
+        拉模式和自带 poller 的宿主传 0 做非阻塞轮询。
+        tick_pending: 见 backend_timeout()，只在 timeout 为 None 时使用。
+        """
+        if timeout is None:
+            timeout = self.backend_timeout(tick_pending)
+        else:
+            self._guest_poll_deadline = self.time() + timeout
+            self._guest_polling = True
+
+        # 执行实际的轮询操作
+        try:
+            events = self._selector.select(timeout)
+        except:
+            return []
+        finally:
+            self._guest_polling = False
+        if self._timerfd is not None and self._timerfd.spin:
+            self._spin_to_timer()
+        return events
+
+    # selector 当前的注册 (fd -> SelectorKey)，proactor loop 上为 None
+    _guest_selector_map = None
+
+    def process_events(self, events):
+        """处理轮询到的I/O事件
+
+        事件是后端线程在这次 tick 之前轮询到的，中间执行的回调（流水线模式下的上一批、
+        executor 的完成回调）可能已经 remove_reader、关闭了 fd 或换了回调，
+        按 selector 当前的注册重新取 key，与标准 loop 在同一次迭代里轮询和处理一致。
+        """
+        selector_map = self._guest_selector_map
+        if events and selector_map is not None:
+            current = []
+            for key, mask in events:
+                key = selector_map.get(key.fd)
+                if key is not None and mask & key.events:
+                    current.append((key, mask & key.events))
+            events = current
+        if events:
+            self._process_events(events)
+
+    def process_ready(self, budget=None):
+        """处理到期的定时器和执行就绪的回调
+
+        budget: 本次 tick 执行回调的时间预算（秒），None 表示不限。
+        预算用完后剩余的 handle 留在 _ready 队首，由下一次 tick 接着执行，
+        每次 tick 至少执行一个 handle。返回留到下一次 tick 的 handle 数。
+        """
+        if budget is None:
+            return self._process_ready(None)
+        deadline = self.time() + budget
+        carried = self._process_ready(deadline)
+        return self._account_ready_budget(carried, self.time() - deadline)
+
+    def drain_ready(self, budget):
+        """drain 模式：_ready 非空时在当前线程上继续处理，省去与后端线程的往返
+
+        每一轮只做非阻塞的轮询（_ready 非空时 poll_events 的超时为 0），
+        直到 loop 真的需要阻塞等待或 budget（秒）用完。
+        返回 _ready 中剩余的 handle 数，为 0 表示可以交还给后端线程去阻塞轮询。
+        """
+        deadline = self.time() + budget
+        while self._ready and self.time() < deadline:
+            self.process_events(self.poll_events())
+            self._process_ready(deadline)
+        return len(self._ready)
+
+    def _process_ready(self, deadline):
+        self._compact_timers()
+        # 处理已过期的计时器
+        end_time = self.time() + self._clock_resolution
+        if self._timer_store is not None:
+            self._ready.extend(self._timer_store.pop_expired(end_time))
+        while self._scheduled:
+            handle = self._scheduled[0]
+            if handle._when >= end_time:
+                break
+            handle = heapq.heappop(self._scheduled)
+            handle._scheduled = False
+            if handle._cancelled:
+                self._timer_cancelled_count -= 1
+            else:
+                self._ready.append(handle)
+        if self._timerfd is not None:
+            self._arm_timerfd()
+
+        # 执行就绪的回调
+        ntodo = len(self._ready)
+        timed = self._slow_callbacks is not None
+        if deadline is None:
+            self._ready_processed += ntodo
+            for i in range(ntodo):
+                handle = self._ready.popleft()
+                if not handle._cancelled:
+                    if timed:
+                        self._run_timed(handle)
+                    else:
+                        handle._run()
+            return 0
+
+        done = 0
+        while done < ntodo:
+            handle = self._ready.popleft()
+            done += 1
+            if not handle._cancelled:
+                if timed:
+                    self._run_timed(handle)
+                else:
+                    handle._run()
+                if self.time() >= deadline:
+                    break
+        self._ready_processed += done
+        return ntodo - done
+
+    def _account_ready_budget(self, carried, overrun):
+        self._ready_budget_ticks += 1
+        self._ready_last_carried = carried
+        self._ready_carried_total += carried
+        if carried or overrun > 0:
+            overrun = max(overrun, 0.0)
+            self._ready_overrun_ticks += 1
+            self._ready_last_overrun = overrun
+            if overrun > self._ready_max_overrun:
+                self._ready_max_overrun = overrun
+        else:
+            self._ready_last_overrun = 0.0
+        return carried
+
+    def ready_budget_stats(self):
+        """process_ready 时间预算的统计"""
+        return {
+            'ticks': self._ready_budget_ticks,
+            'overrun_ticks': self._ready_overrun_ticks,
+            'carried_total': self._ready_carried_total,
+            'last_carried': self._ready_last_carried,
+            'last_overrun': self._ready_last_overrun,
+            'max_overrun': self._ready_max_overrun,
+        }
+
+
+class GuestSelectorEventLoop(GuestEventLoopMixin, asyncio.SelectorEventLoop):
+    pass
+
+
+if sys.platform == 'win32':
+    class GuestProactorEventLoop(GuestEventLoopMixin, asyncio.ProactorEventLoop):
+        """backend_fd()/set_timerfd() 不可用，poll_events 等待 IOCP 完成端口"""
+
+    # 与 asyncio 在 Windows 上的默认 loop 保持一致
+    GuestEventLoop = GuestProactorEventLoop
+else:
+    GuestEventLoop = GuestSelectorEventLoop
+
+
+def new_guest_event_loop():
+    """创建当前平台默认类型的 guest mode 事件循环"""
+    return GuestEventLoop()
+
+
+# guest mode 慢回调记录
+# duration: 耗时（秒）；callback: 回调或 task 协程的 qualname；task: task 名，非 task 为 None；
+# stack: task 协程栈（traceback.StackSummary），task 已结束或非 task 为 None；
+# when: 记录时的 loop.time()
+SlowCallback = collections.namedtuple('SlowCallback', 'duration callback task stack when')
+
+
+def _coro_stack(coro, limit=32):
+    """沿 cr_await/gi_yieldfrom 展开挂起协程的 await 链，不读取源码行"""
+    frames = []
+    while coro is not None and len(frames) < limit:
+        frame = getattr(coro, 'cr_frame', None) or getattr(coro, 'gi_frame', None)
+        if frame is None:
+            break
+        frames.append((frame, frame.f_lineno))
+        coro = getattr(coro, 'cr_await', None) or getattr(coro, 'gi_yieldfrom', None)
+    return traceback.StackSummary.extract(frames, lookup_lines=False)
@@ -0,0 +1,81 @@
+"""guest loop 的默认 executor：完成结果直接交给宿主线程
+
+标准的 run_in_executor 在工作线程里用 call_soon_threadsafe 回到 loop：写 self-pipe ->
+后端线程的 select 醒来 -> run_sync_soon_threadsafe 投递 tick -> UI 线程上才设置 future。
+GuestExecutor 的完成回调直接放进 GuestRunner 的批量队列，一批只向宿主投递一次，
+宿主线程派发时设置 future 并立即执行由此就绪的回调，不经过后端线程的轮询。
+
+GuestRunner 默认把它设为 loop 的默认 executor 并预先启动工作线程，
+loop.getaddrinfo 等内部使用默认 executor 的 API 也走这条路径。
+"""
+import concurrent.futures
+import sys
+from functools import partial
+
+# 3.12 起工作线程在队列为空、开始阻塞等待之前 release _idle_semaphore，刚启动的线程自己就算空闲；
+# 之前的版本只在做完一个任务后 release
+_WORKERS_COUNT_THEMSELVES_IDLE = sys.version_info >= (3, 12)
+
+
+def _copy_state(future, source):
+    """在宿主线程上把 concurrent.futures.Future 的结果复制到 asyncio future"""
+    if future.cancelled():
+        return
+    if source.cancelled():
+        future.cancel()
+        return
+    exc = source.exception()
+    if exc is not None:
+        future.set_exception(exc)
+    else:
+        future.set_result(source.result())
+
+
+def _cancel_source(source, future):
+    if future.cancelled():
+        source.cancel()
+
+
+class GuestExecutor(concurrent.futures.ThreadPoolExecutor):
+    """post_completion(func): 线程安全地安排 func 在宿主线程上执行，由 GuestRunner 提供；
+    None 时退回 loop.call_soon_threadsafe，与标准 executor 相同"""
+
+    def __init__(self, max_workers=None, thread_name_prefix='guest-executor', post_completion=None):
+        super().__init__(max_workers, thread_name_prefix)
+        self._post_completion = post_completion
+
+    def prewarm(self, n=None):
+        """预先启动 n 个工作线程（默认 max_workers），避免第一次调用时才创建线程"""
+        n = self._max_workers if n is None else min(n, self._max_workers)
+        # _adjust_thread_count 拿到空闲许可就不建线程，先把现有的许可收回来，最后原样还回去
+        permits = 0
+        while self._idle_semaphore.acquire(timeout=0):
+            permits += 1
+        created = 0
+        while len(self._threads) < n:
+            before = len(self._threads)
+            self._adjust_thread_count()
+            if len(self._threads) > before:
+                created += 1
+            else:
+                # 这期间有工作线程 release 了一次，被 _adjust_thread_count 拿走
+                permits += 1
+        # 3.12 之前刚启动的线程不算空闲，只给这次新建的线程补上，
+        # 不补的话第一次 submit 还会在 UI 线程上再新建一个线程
+        if not _WORKERS_COUNT_THEMSELVES_IDLE:
+            permits += created
+        for _ in range(permits):
+            self._idle_semaphore.release()
+
+    def run_in_guest(self, loop, func, *args):
+        """loop.run_in_executor 的实现，返回 loop 上的 asyncio future"""
+        future = loop.create_future()
+        source = self.submit(func, *args)
+        post = self._post_completion
+        if post is None:
+            source.add_done_callback(
+                lambda source: loop.call_soon_threadsafe(_copy_state, future, source))
+        else:
+            source.add_done_callback(lambda source: post(partial(_copy_state, future, source)))
+        future.add_done_callback(partial(_cancel_source, source))
+        return future
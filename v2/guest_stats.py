@@ -0,0 +1,104 @@
+"""guest loop 的累计统计
+
+计数和直方图都在 tick 的热路径上更新，所以直方图是固定分桶的：
+预先算好的上界 + bisect 定位 + array 计数，不分配对象。
+asyncio_guest_run 返回的 task 上调用 stats() 得到快照。
+"""
+from array import array
+from bisect import bisect_left
+
+# 时间类直方图的桶上界：1us, 2us, 4us ... 约 1s（秒）
+TIME_BOUNDS = tuple(1e-6 * 2 ** i for i in range(21))
+# 计数类直方图的桶上界：0, 1, 2, 4 ... 4096
+COUNT_BOUNDS = (0,) + tuple(2 ** i for i in range(13))
+
+
+class Histogram:
+    """固定分桶直方图；bounds 为升序的桶上界（含），最后一个桶收集超出最大上界的值"""
+
+    __slots__ = ('bounds', 'counts', 'n', 'total', 'max')
+
+    def __init__(self, bounds):
+        self.bounds = tuple(bounds)
+        self.counts = array('q', bytes(8 * (len(self.bounds) + 1)))
+        self.n = 0
+        self.total = 0
+        self.max = 0
+
+    def add(self, value):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.n += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, q):
+        """q 分位所在桶的上界；落在溢出桶时返回观测到的最大值"""
+        if not self.n:
+            return None
+        rank = q * self.n
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                return self.bounds[i] if i < len(self.bounds) else self.max
+        return self.max
+
+    def snapshot(self):
+        return {
+            'n': self.n,
+            'total': self.total,
+            'mean': self.total / self.n if self.n else None,
+            'max': self.max,
+            'p50': self.percentile(0.50),
+            'p99': self.percentile(0.99),
+            'bounds': self.bounds,
+            'counts': self.counts.tolist(),
+        }
+
+
+class GuestStats:
+    """一个 guest loop 的累计统计
+
+    UI 线程和后端线程各自只写属于自己的字段，快照时不加锁，读到的可能是两边略有先后的值。
+    """
+
+    def __init__(self):
+        self.ticks = 0
+        # 后端线程
+        self.events_per_poll = Histogram(COUNT_BOUNDS)
+        self.poll_time = Histogram(TIME_BOUNDS)
+        self.backend_sem_wait = Histogram(TIME_BOUNDS)
+        # UI 线程
+        self.ready_per_tick = Histogram(COUNT_BOUNDS)
+        self.process_events_time = Histogram(TIME_BOUNDS)
+        self.process_ready_time = Histogram(TIME_BOUNDS)
+        self.dispatch_lag = Histogram(TIME_BOUNDS)
+        self.ui_sem_release = Histogram(TIME_BOUNDS)
+        self.timers = Histogram(COUNT_BOUNDS)
+        # GuestRunner.run 提交到第一步开始执行的时间
+        self.first_callback = Histogram(TIME_BOUNDS)
+
+    def record_poll(self, sem_wait, poll_time, events):
+        self.backend_sem_wait.add(sem_wait)
+        self.poll_time.add(poll_time)
+        self.events_per_poll.add(events)
+
+    def record_tick(self, ready, dispatch_lag, timers):
+        self.ticks += 1
+        self.ready_per_tick.add(ready)
+        if dispatch_lag is not None:
+            self.dispatch_lag.add(dispatch_lag)
+        self.timers.add(timers)
+
+    _HISTOGRAMS = ('events_per_poll', 'poll_time', 'backend_sem_wait',
+                   'ready_per_tick', 'process_events_time', 'process_ready_time',
+                   'dispatch_lag', 'ui_sem_release', 'timers', 'first_callback')
+
+    def snapshot(self, loop=None):
+        result = {'ticks': self.ticks}
+        for name in self._HISTOGRAMS:
+            result[name] = getattr(self, name).snapshot()
+        if loop is not None and not loop.is_closed():
+            result['timer_store'] = loop.timer_stats()
+        return result
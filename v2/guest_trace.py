@@ -0,0 +1,83 @@
+"""guest loop 的 tick 跟踪
+
+每个 UI tick 写一条紧凑记录到预分配的环形缓冲区（每个字段一个 array），
+写入时不创建任何容器对象；asyncio_guest_run(tracer=None) 时 tick 里只多一次
+`if tracer is not None` 判断。
+
+    tracer = TickTracer(capacity=8192)
+    asyncio_guest_run(..., tracer=tracer)
+    ...
+    for record in tracer.drain():   # 增量取出上次之后的新记录
+        ...
+    tracer.dump(sys.stderr)         # 输出缓冲区中全部记录
+"""
+from array import array
+from collections import namedtuple
+
+TickRecord = namedtuple('TickRecord', 'tick poll_duration events ready dispatch_lag')
+TickRecord.__doc__ = """\
+tick: tick 序号
+poll_duration: 后端线程 poll_events 花费的时间（秒），非轮询触发的 tick 为 0
+events: 本次 tick 处理的 selector 事件数
+ready: 本次 tick 里 process_ready 执行的 handle 数（loop._ready_processed 的增量），
+    包括到期的定时器和跳过的已取消 handle，不包括因预算用完留到下一个 tick 的
+dispatch_lag: 从后端线程 run_sync_soon_threadsafe 到 UI 线程开始执行的时间（秒）
+"""
+
+
+class TickTracer:
+    def __init__(self, capacity=4096):
+        if capacity <= 0:
+            raise ValueError(f'capacity must be positive, got {capacity!r}')
+        self.capacity = capacity
+        self._tick = array('q', bytes(8 * capacity))
+        self._poll = array('d', bytes(8 * capacity))
+        self._events = array('q', bytes(8 * capacity))
+        self._ready = array('q', bytes(8 * capacity))
+        self._lag = array('d', bytes(8 * capacity))
+        self._pos = 0          # 下一条记录写入的位置
+        self._written = 0      # 累计写入的记录数
+        self._read = 0         # drain() 已经取走的记录数
+        # 没来得及被 drain() 取走就被覆盖的记录数
+        self.dropped = 0
+
+    def record(self, tick, poll_duration, events, ready, dispatch_lag):
+        pos = self._pos
+        self._tick[pos] = tick
+        self._poll[pos] = poll_duration
+        self._events[pos] = events
+        self._ready[pos] = ready
+        self._lag[pos] = dispatch_lag
+        pos += 1
+        self._pos = 0 if pos == self.capacity else pos
+        self._written += 1
+
+    def _slice(self, start):
+        # start: 累计序号，返回 [start, _written) 中仍在缓冲区里的记录
+        start = max(start, self._written - self.capacity)
+        cap = self.capacity
+        return [
+            TickRecord(self._tick[i % cap], self._poll[i % cap], self._events[i % cap],
+                       self._ready[i % cap], self._lag[i % cap])
+            for i in range(start, self._written)
+        ]
+
+    def records(self):
+        """缓冲区中的全部记录，按时间顺序"""
+        return self._slice(0)
+
+    def drain(self):
+        """上次 drain() 之后的新记录，用于流式导出；被覆盖的条数见 dropped"""
+        self.dropped += max(0, self._written - self.capacity - self._read)
+        records = self._slice(self._read)
+        self._read = self._written
+        return records
+
+    def dump(self, file):
+        file.write('\t'.join(TickRecord._fields) + '\n')
+        for record in self.records():
+            file.write(f'{record.tick}\t{record.poll_duration:.9f}\t{record.events}\t'
+                       f'{record.ready}\t{record.dispatch_lag:.9f}\n')
+
+    def clear(self):
+        self._pos = self._written = self._read = self.dropped = 0
@@ -0,0 +1,35 @@
+"""UI 线程与后端线程之间每个 tick 的交接（仅 Linux，Python 3.10+）
+
+threading.Semaphore 是纯 Python 实现：acquire 要拿 Condition 的锁、分配一把等待锁再阻塞，
+release 要拿锁、notify、再释放等待锁，一次交接有好几次加解锁和 GIL 往返。
+EventFdSemaphore 用一个 EFD_SEMAPHORE 模式的 eventfd：release 是一次 write，
+acquire 是一次阻塞的 read（期间释放 GIL），接口与 Semaphore 的这两个方法相同。
+
+把 eventfd 直接放进后端的 select 集合、让“UI 处理完”和“I/O 就绪”由同一次阻塞调用返回，
+需要后端在 UI 处理上一批时就已经在 select 里，而那一批的 fd 是水平触发、一直就绪的，
+selectors 又不支持 EPOLLONESHOT；这正是流水线模式（pipeline=True）处理的情况。
+严格交替模式下这里只把交接本身换成一次系统调用。
+"""
+import os
+
+AVAILABLE = hasattr(os, 'eventfd')
+
+
+class EventFdSemaphore:
+    def __init__(self, value=0):
+        self._fd = os.eventfd(value, os.EFD_SEMAPHORE | os.EFD_CLOEXEC)
+
+    def fileno(self):
+        return self._fd
+
+    def acquire(self):
+        os.eventfd_read(self._fd)
+        return True
+
+    def release(self):
+        os.eventfd_write(self._fd, 1)
+
+    def close(self):
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
@@ -0,0 +1,73 @@
+"""Qt 宿主：QSocketNotifier 监听 selector 的 fd，单次 QTimer 对准下一个 asyncio 定时器
+
+不需要后端线程，只有有事可做时才 tick：
+- selector 的 fd（Linux 上是 epoll fd）可读时 QSocketNotifier 触发 tick
+- 每次 tick 结束后把单次 QTimer 设到下一个定时器的截止时间，_ready 非空时设为 0
+- 定时器时长来自 loop.backend_timeout()，此后 Qt 信号处理函数里的 call_soon /
+  更早的 call_at 会像打断后端线程一样写 self-pipe，让 notifier 触发，不用轮询
+
+    task = qt_guest_run(main, done_callback=lambda outcome: app.quit())
+    app.exec_()
+
+要求 selector 有 fileno()（epoll/kqueue/devpoll），SelectSelector 不行。
+"""
+import math
+
+from PyQt5.QtCore import QObject, QSocketNotifier, Qt, QTimer
+
+from asyncio_guest_run import GuestLoop
+
+
+class QtGuestDriver(QObject):
+    def __init__(self, guest, ready_budget=None, parent=None):
+        super().__init__(parent)
+        self.guest = guest
+        self.ready_budget = ready_budget
+        self.ticks = 0
+        self._notifier = QSocketNotifier(guest.fileno(), QSocketNotifier.Read, self)
+        self._notifier.activated.connect(self._tick)
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setTimerType(Qt.PreciseTimer)
+        self._timer.timeout.connect(self._tick)
+
+    def start(self):
+        self._timer.start(0)
+
+    def stop(self):
+        self._notifier.setEnabled(False)
+        self._timer.stop()
+        self.guest.loop.cancel_backend_timeout()
+
+    def _tick(self, *args):
+        self.ticks += 1
+        self.guest.tick(self.ready_budget)
+        if self._notifier.isEnabled():
+            self._rearm()
+
+    def _rearm(self):
+        # 之后调度的更早的工作会写 self-pipe，由 notifier 触发
+        timeout = self.guest.timeout()
+        if timeout is None:
+            self._timer.stop()
+            return
+        # 向上取整，避免在定时器到期前一点点醒来又空转一轮
+        self._timer.start(math.ceil(timeout * 1e3))
+
+
+def qt_guest_run(async_func, *async_func_args, done_callback, ready_budget=None):
+    """在 Qt 事件循环里运行 async_func，与 asyncio_guest_run 相同的 done_callback 约定
+
+    必须在已经创建了 QCoreApplication/QApplication 的线程上调用。
+    ready_budget: 每次 tick 执行就绪回调的时间预算（秒），None 表示不限。
+    """
+    def on_done(outcome):
+        driver.stop()
+        # on_done 在 tick 里调用，这时关闭 loop 会打断 _process_ready，等回到事件循环再关
+        QTimer.singleShot(0, guest.close)
+        done_callback(outcome)
+
+    guest = GuestLoop(async_func, *async_func_args, done_callback=on_done)
+    driver = QtGuestDriver(guest, ready_budget)
+    driver.start()
+    return guest.task
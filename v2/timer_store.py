@@ -0,0 +1,210 @@
+"""guest loop 的可插拔定时器存储
+
+通过 loop.set_timer_store(store) 替换 BaseEventLoop 默认的 _scheduled 堆，
+只在 guest mode 的 poll_events/process_ready 中使用。store 需要实现：
+
+    push(handle)            加入一个 TimerHandle
+    next_deadline()         最早的 _when，没有定时器时返回 None；O(1) 且只读，
+                            因为后端线程会在 UI 线程调度新定时器的同时调用它
+    pop_expired(end_time)   取出所有 _when < end_time 且未取消的 handle，按 _when 排序
+    handles()               迭代所有仍在存储中的 handle
+    compact()               丢弃所有已取消的 handle
+    clear()
+    __len__()               包括已取消但还没丢弃的 handle
+    cancelled               已取消但还没丢弃的 handle 数，由 loop 在 cancel() 时加一
+
+除 next_deadline 外的方法都只在 UI 线程上调用。已取消的 handle 延迟到取出时才丢弃，
+与默认的 _scheduled 堆一样；比例过高时 loop 会调用 compact()。
+
+两种实现：
+- HeapTimerStore: (when, id, handle) 元组的堆，比较只发生在 C 层的 float/int 上，
+  不再调用 TimerHandle.__lt__；每次取出到期定时器比默认的堆便宜
+- TimingWheel: 哈希时间轮，按 resolution 把定时器分到槽里，加入定时器通常只是 list.append；
+  只对已占用的槽号（int）维护一个小堆，取出到期定时器不用逐个下沉。
+  适合每个 tick 都有大量定时器到期的场景（大量短超时、周期性的 sleep）
+
+定时器很多但大多在远处等待、很少到期时（例如 5 万个 30 秒的每连接超时），
+新定时器总是加在堆尾附近，heappush 平均 O(1)，默认的堆已经够快，两种存储都没有优势；
+见 bench.timer_store 的 --timeout。
+"""
+import itertools
+from heapq import heapify, heappop, heappush
+from operator import attrgetter
+
+_when = attrgetter('_when')
+
+
+class HeapTimerStore:
+    def __init__(self):
+        self._heap = []
+        self.cancelled = 0
+
+    def push(self, handle):
+        # id() 只用来打破 _when 相同时的平局，保证永远不会比较到 handle 本身
+        heappush(self._heap, (handle._when, id(handle), handle))
+
+    def next_deadline(self):
+        heap = self._heap
+        return heap[0][0] if heap else None
+
+    def pop_expired(self, end_time):
+        heap = self._heap
+        expired = []
+        # 顺便弹出堆顶已取消的 handle，让 next_deadline 不会因为它们提前醒来
+        while heap and (heap[0][0] < end_time or heap[0][2]._cancelled):
+            handle = heappop(heap)[2]
+            handle._scheduled = False
+            if handle._cancelled:
+                self.cancelled -= 1
+            else:
+                expired.append(handle)
+        return expired
+
+    def handles(self):
+        return (entry[2] for entry in self._heap)
+
+    def compact(self):
+        live = []
+        for entry in self._heap:
+            if entry[2]._cancelled:
+                entry[2]._scheduled = False
+            else:
+                live.append(entry)
+        # 元组按 (float, int) 比较，heapify 全在 C 层完成；
+        # 后端线程只读 _heap[0]，整体替换列表是安全的
+        heapify(live)
+        self._heap = live
+        self.cancelled = 0
+
+    def clear(self):
+        self._heap.clear()
+        self.cancelled = 0
+
+    def __len__(self):
+        return len(self._heap)
+
+
+class TimingWheel:
+    """哈希时间轮
+
+    resolution: 槽宽（秒）。同一个槽里的定时器取出时按 _when 排序，
+        所以精度不受槽宽影响，槽宽只决定槽的数量。槽太细时大多数 push 都要新建一个槽、
+        往槽号堆里加一项，太粗时每次取出要扫一个很长的槽；默认 4ms 在 bench.timer_store
+        的几种超时下都不差。
+    """
+
+    def __init__(self, resolution=0.004):
+        self._resolution = resolution
+        self._slots_per_second = 1.0 / resolution
+        self._slots = {}          # 槽号 -> [TimerHandle]
+        self._occupied = []       # 已占用槽号的堆
+        self._len = 0
+        self.cancelled = 0
+        # 最早的 _when，只在 UI 线程上更新，后端线程只读
+        self._head = None
+
+    def push(self, handle):
+        when = handle._when
+        slot = int(when * self._slots_per_second)
+        slots = self._slots
+        if slot in slots:
+            slots[slot].append(handle)
+        else:
+            slots[slot] = [handle]
+            heappush(self._occupied, slot)
+        self._len += 1
+        head = self._head
+        if head is None or when < head:
+            self._head = when
+
+    def next_deadline(self):
+        return self._head
+
+    def pop_expired(self, end_time):
+        head = self._head
+        # 大多数 tick 没有定时器到期，不用再扫一遍队首的槽；队首已取消时最多提前醒来一次，
+        # 到那时它的槽会被扫到并丢弃
+        if head is None or head >= end_time:
+            return []
+        slots = self._slots
+        occupied = self._occupied
+        # 与 push 用同一个单调的换算，_when < end_time 的 handle 一定落在 <= last_slot 的槽里
+        last_slot = int(end_time * self._slots_per_second)
+        expired = []
+        while occupied and occupied[0] <= last_slot:
+            slot = occupied[0]
+            bucket = slots[slot]
+            keep = []
+            for handle in bucket:
+                if handle._cancelled:
+                    handle._scheduled = False
+                    self.cancelled -= 1
+                elif handle._when < end_time:
+                    handle._scheduled = False
+                    expired.append(handle)
+                else:
+                    keep.append(handle)
+            self._len -= len(bucket) - len(keep)
+            if keep:
+                # 槽里还有没到期的，后面的槽更不会到期；剩下的都不早于 end_time，
+                # 也不用再扫一遍找最早的 _when
+                slots[slot] = keep
+                self._head = min(map(_when, keep))
+                break
+            del slots[slot]
+            heappop(occupied)
+        else:
+            self._update_head()
+        # 槽按顺序取出，只有同一个槽里的 handle 之间是乱序的，timsort 对这种分段有序的输入接近线性
+        if len(expired) > 1:
+            expired.sort(key=_when)
+        return expired
+
+    def _drop_cancelled(self, slot):
+        """丢弃槽里已取消的 handle，返回剩下的 handle"""
+        bucket = self._slots[slot]
+        live = [handle for handle in bucket if not handle._cancelled]
+        dropped = len(bucket) - len(live)
+        if dropped:
+            for handle in bucket:
+                if handle._cancelled:
+                    handle._scheduled = False
+            self._len -= dropped
+            self.cancelled -= dropped
+            self._slots[slot] = live
+        return live
+
+    def _update_head(self):
+        slots = self._slots
+        occupied = self._occupied
+        while occupied:
+            live = self._drop_cancelled(occupied[0])
+            if live:
+                self._head = min(map(_when, live))
+                return
+            del slots[heappop(occupied)]
+        self._head = None
+
+    def handles(self):
+        return itertools.chain.from_iterable(self._slots.values())
+
+    def compact(self):
+        slots = self._slots
+        for slot in list(slots):
+            if not self._drop_cancelled(slot):
+                del slots[slot]
+        # 槽号是 int，heapify 全在 C 层完成
+        occupied = list(slots)
+        heapify(occupied)
+        self._occupied = occupied
+        self._update_head()
+
+    def clear(self):
+        self._slots.clear()
+        self._occupied.clear()
+        self._len = 0
+        self.cancelled = 0
+        self._head = None
+
+    def __len__(self):
+        return self._len
@@ -0,0 +1,93 @@
+"""guest loop 的 timerfd 定时器唤醒（仅 Linux）
+
+loop.set_timerfd(TimerFd()) 之后，loop 让一个 timerfd 始终设在最早的定时器截止时间，
+并注册在自己的 selector 里。定时器到期时 selector 的 fd 直接可读，不再依赖按毫秒取整、
+每次轮询只算一次的 select 超时：后端线程以及通过 loop.backend_fd() 等待的宿主 poller
+都能在截止时间精确醒来，backend_timeout() 也不再因为定时器返回有限的超时。
+
+spin: 提前多少秒唤醒，剩下的时间在 poll_events 里忙等到截止时间，
+    用一点 CPU 换掉调度器唤醒的抖动，例如 0.0002。
+
+Python 3.13+ 用 os.timerfd_*，更早的版本通过 ctypes 调用 libc。
+"""
+import os
+
+# <sys/timerfd.h>
+CLOCK_MONOTONIC = 1
+TFD_NONBLOCK = os.O_NONBLOCK
+TFD_CLOEXEC = os.O_CLOEXEC
+TFD_TIMER_ABSTIME = 1
+
+if hasattr(os, 'timerfd_create'):
+    def _create():
+        return os.timerfd_create(CLOCK_MONOTONIC, flags=TFD_NONBLOCK | TFD_CLOEXEC)
+
+    def _settime_ns(fd, flags, initial_ns):
+        os.timerfd_settime_ns(fd, flags=flags, initial=initial_ns)
+else:
+    import ctypes
+
+    class _timespec(ctypes.Structure):
+        _fields_ = [('tv_sec', ctypes.c_long), ('tv_nsec', ctypes.c_long)]
+
+    class _itimerspec(ctypes.Structure):
+        _fields_ = [('it_interval', _timespec), ('it_value', _timespec)]
+
+    _libc = ctypes.CDLL(None, use_errno=True)
+    _libc.timerfd_create.argtypes = [ctypes.c_int, ctypes.c_int]
+    _libc.timerfd_settime.argtypes = [ctypes.c_int, ctypes.c_int,
+                                      ctypes.POINTER(_itimerspec), ctypes.POINTER(_itimerspec)]
+
+    def _create():
+        fd = _libc.timerfd_create(CLOCK_MONOTONIC, TFD_NONBLOCK | TFD_CLOEXEC)
+        if fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+        return fd
+
+    def _settime_ns(fd, flags, initial_ns):
+        spec = _itimerspec()
+        spec.it_value.tv_sec, spec.it_value.tv_nsec = divmod(initial_ns, 1_000_000_000)
+        if _libc.timerfd_settime(fd, flags, ctypes.byref(spec), None) < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+
+
+class TimerFd:
+    def __init__(self, spin=0.0):
+        if spin < 0:
+            raise ValueError(f'spin must be non-negative, got {spin!r}')
+        self.spin = spin
+        self._fd = _create()
+        # 当前设定的截止时间（loop.time()，即 CLOCK_MONOTONIC 秒），None 表示未设定
+        self.deadline = None
+
+    def fileno(self):
+        return self._fd
+
+    def arm(self, when):
+        """在 when - spin 时刻可读；when 早于当前时间时立即可读"""
+        self.deadline = when
+        # 绝对时间为 0 表示停止定时器，所以至少设为 1ns
+        _settime_ns(self._fd, TFD_TIMER_ABSTIME, max(1, int((when - self.spin) * 1e9)))
+
+    def disarm(self):
+        self.deadline = None
+        _settime_ns(self._fd, 0, 0)
+
+    def read(self):
+        """selector 报告可读时调用，清掉到期计数
+
+        读到计数说明这次设定已经到期，deadline 清为 None，loop 会按最早的定时器
+        重新设定；期间已经重新设定过（计数被清零）时什么也不做。
+        """
+        try:
+            os.read(self._fd, 8)
+        except BlockingIOError:
+            return
+        self.deadline = None
+
+    def close(self):
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
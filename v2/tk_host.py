@@ -0,0 +1,66 @@
+import os
+import tkinter
+
+from dispatcher import CoalescingDispatcher
+
+
+class TkHost:
+    """asyncio_guest_run 的 Tk 宿主
+
+    后端线程不直接调用 root.after（Tcl 不保证它跨线程安全），而是往一个 self-pipe
+    写一个字节；管道读端用 createfilehandler 注册到 Tcl 的 notifier，Tk 主循环本来就
+    阻塞在 notifier 上，所以空闲时不占 CPU。一批回调只写一次管道
+    （CoalescingDispatcher），可读时在 Tk 线程上整批执行。
+
+    root: tkinter.Tk()，无显示环境下也可以是 tkinter.Tcl()。
+    createfilehandler 只在 Unix 上可用。
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.outcome = None
+        self._running = False
+        self._wakeup_r, self._wakeup_w = os.pipe()
+        os.set_blocking(self._wakeup_r, False)
+        os.set_blocking(self._wakeup_w, False)
+        root.tk.createfilehandler(self._wakeup_r, tkinter.READABLE, self._on_wakeup)
+        self.dispatcher = CoalescingDispatcher(self._post_wakeup)
+
+    def _post_wakeup(self, drain):
+        try:
+            os.write(self._wakeup_w, b'\0')
+        except BlockingIOError:
+            # 管道已满说明读端还没处理，已经可读了
+            pass
+
+    def _on_wakeup(self, fd, mask):
+        try:
+            os.read(fd, 4096)
+        except BlockingIOError:
+            pass
+        self.dispatcher.drain()
+
+    def run_sync_soon_threadsafe(self, func):
+        self.dispatcher.run_sync_soon_threadsafe(func)
+
+    def run_sync_soon_not_threadsafe(self, func):
+        self.dispatcher.run_sync_soon_threadsafe(func)
+
+    def done_callback(self, outcome):
+        self.outcome = outcome
+        self._running = False
+        self.root.quit()
+
+    def mainloop(self):
+        self._running = True
+        while self._running:
+            # 有 Tk 主窗口时 root.mainloop() 一直运行到 quit()；tkinter.Tcl() 或主窗口
+            # 已经销毁时它会立即返回，这时逐个处理 Tcl 事件，直到 guest 结束
+            self.root.mainloop()
+            if self._running:
+                self.root.tk.dooneevent()
+
+    def close(self):
+        self.root.tk.deletefilehandler(self._wakeup_r)
+        os.close(self._wakeup_r)
+        os.close(self._wakeup_w)